@@ -5,6 +5,8 @@ Module implementing animals on the island.
 import random
 import math
 
+import numpy as np
+
 
 class Animals:
     """
@@ -51,7 +53,43 @@ class Animals:
 
         cls.parameters.update(new_params)
 
-    def __init__(self, age=None, weight=None):
+    @classmethod
+    def from_array(cls, ages, weights):
+        """
+        Create animals from arrays of ages and weights.
+
+        Ages and weights are validated for all animals at once, and no birth weight
+        is drawn since every weight is given.
+
+        :param ages: ages of the animals, integers >= 0.
+        :type ages: array_like
+        :param weights: weights of the animals, >= 0.
+        :type weights: array_like
+
+        :return: list of new animals, in the same order as ages and weights.
+        :rtype: list
+        """
+        ages = np.asarray(ages)
+        weights = np.asarray(weights)
+        if ages.shape != weights.shape:
+            raise ValueError('ages and weights must have the same length')
+        if np.any(ages < 0) or np.any(ages // 1 != ages):
+            raise ValueError('Animal age has to be an integer >= 0')
+        if np.any(weights < 0):
+            raise ValueError('Animal weight has to be a positive number')
+
+        animals = []
+        for age, weight in zip(ages.tolist(), weights.tolist()):
+            animal = cls.__new__(cls)
+            animal.classname = cls.__name__
+            animal.age = age
+            animal.weight = weight
+            animal.update_fitness()
+            animal.regain_appetite()
+            animals.append(animal)
+        return animals
+
+    def __init__(self, age=None, weight=None, rng=random):
         """
         Initializing animal objects. Objects get age, weight,
         fitness and apatite be default.
@@ -60,6 +98,9 @@ class Animals:
         :type age: float
         :param weight: weight of animal
         :type weight: float
+        :param rng: random number generator drawing the birth weight,
+                    the :mod:`random` module by default.
+        :type rng: random.Random
 
         """
         self.classname = self.__class__.__name__
@@ -68,7 +109,7 @@ class Animals:
         if self.age < 0 or self.age // 1 != self.age:
             raise ValueError('Animal age has to be an integer >= 0')
 
-        random_weight = random.gauss(self.parameters['w_birth'], self.parameters['sigma_birth'])
+        random_weight = rng.gauss(self.parameters['w_birth'], self.parameters['sigma_birth'])
         self.weight = weight if weight is not None else random_weight
         if self.weight < 0:
             raise ValueError('Animal weight has to be a positive number')
@@ -110,7 +151,7 @@ class Animals:
         # noinspection PyAttributeOutsideInit
         self.appetite = self.parameters['F']
 
-    def gives_birth(self, pop_size):
+    def gives_birth(self, pop_size, rng=random):
         r"""
         Decides whether an animal gives birth.
 
@@ -126,43 +167,80 @@ class Animals:
         :math:`\xi * \text{newborn's weight}`, and the fitness is updated accordingly.
 
         :param pop_size: number of animals of the same species in a cell.
+        :param rng: random number generator, the :mod:`random` module by default.
+        :type rng: random.Random
         :return: newborn of class Herbivore or Carnivore, if animal is born.
                  False if no animal is born.
         :rtype: bool or object
 
         """
-        preg_prob = min(1, self.parameters['gamma'] * self.fitness * (pop_size - 1))
-
-        if random.random() < preg_prob:
-            newborn = type(self)()
-            if self.weight < self.parameters['zeta'] * \
-                    (self.parameters['w_birth'] + self.parameters['sigma_birth']):
-                return False
-            elif self.weight < self.parameters['xi'] * newborn.weight:
-                return False
-            else:
-                self.weight -= self.parameters['xi'] * newborn.weight
-                self.update_fitness()
-                return newborn
-
+        if rng.random() < self.birth_probability(pop_size):
+            return self.birth(rng=rng)
         else:
             return False
 
-    def migrate(self):
+    def birth_probability(self, pop_size):
+        r"""
+        Probability of getting pregnant, :math:`\min(1, \gamma * \Phi * (N - 1))`.
+
+        :param pop_size: number of animals of the same species in a cell.
+        :type pop_size: int
+
+        :return: birth probability.
+        :rtype: float
+        """
+        return min(1, self.parameters['gamma'] * self.fitness * (pop_size - 1))
+
+    def birth(self, rng=random):
+        """
+        Gives birth after the animal got pregnant, see :meth:`gives_birth`.
+        The newborn is only born if the animal is heavy enough.
+
+        :param rng: random number generator drawing the newborn's weight.
+        :type rng: random.Random
+
+        :return: newborn of class Herbivore or Carnivore, if animal is born.
+                 False if no animal is born.
+        :rtype: bool or object
+        """
+        newborn = type(self)(rng=rng)
+        if self.weight < self.parameters['zeta'] * \
+                (self.parameters['w_birth'] + self.parameters['sigma_birth']):
+            return False
+        elif self.weight < self.parameters['xi'] * newborn.weight:
+            return False
+        else:
+            self.weight -= self.parameters['xi'] * newborn.weight
+            self.update_fitness()
+            return newborn
+
+    def migrate(self, rng=random):
         r"""
         Function determines if animals migrate or not.
         An animal moves with a probability of :math:`p_{move} = \mu * \Phi`.
 
+        :param rng: random number generator, the :mod:`random` module by default.
+        :type rng: random.Random
+
         :return: True, if animal migrates.
                  False, if animal does not migrate.
         :rtype: bool
 
         """
-        if random.random() < self.parameters['mu'] * self.fitness:
+        if rng.random() < self.migration_probability():
             return True
         else:
             return False
 
+    def migration_probability(self):
+        r"""
+        Probability of migrating, :math:`\mu * \Phi`.
+
+        :return: migration probability.
+        :rtype: float
+        """
+        return self.parameters['mu'] * self.fitness
+
     def update_age(self, years=None):
         """
         Updates age of animal, and updates fitness accordingly.
@@ -184,7 +262,7 @@ class Animals:
         self.weight -= self.parameters['eta'] * self.weight
         self.update_fitness()
 
-    def dies(self):
+    def dies(self, rng=random):
         r"""
         Decides whether an animal dies.
 
@@ -192,6 +270,9 @@ class Animals:
 
         else, :math:`p_{death} = \omega(1-\Phi)`
 
+        :param rng: random number generator, the :mod:`random` module by default.
+        :type rng: random.Random
+
         :return: True, if animal dies. False, if animal does not die.
         :rtype: bool
 
@@ -199,7 +280,19 @@ class Animals:
         if self.weight <= 0:
             return True
         else:
-            return random.random() < (self.parameters['omega'] * (1 - self.fitness))
+            return rng.random() < self.death_probability()
+
+    def death_probability(self):
+        r"""
+        Probability of dying, 1 if :math:`w <= 0`, else :math:`\omega(1-\Phi)`.
+
+        :return: death probability.
+        :rtype: float
+        """
+        if self.weight <= 0:
+            return 1
+        else:
+            return self.parameters['omega'] * (1 - self.fitness)
 
     def set_weight(self, new_weight):
         """
@@ -264,7 +357,7 @@ class Carnivore(Animals):
                   'omega': 0.8, 'F': 50.0,
                   'DeltaPhiMax': 10.0}
 
-    def carnivore_feeding(self, herb):
+    def carnivore_feeding(self, herb, rng=random):
         r"""
         Decides weather or not a carnivore killes a herbivore.
 
@@ -279,6 +372,8 @@ class Carnivore(Animals):
 
         :param herb: A herbivore in the same cell as the carnivore.
         :type herb: object
+        :param rng: random number generator, the :mod:`random` module by default.
+        :type rng: random.Random
 
         :return: True if the carnivore kills the herbivore, and false if it doesn't
         :rtype: bool
@@ -291,7 +386,7 @@ class Carnivore(Animals):
             prey_prob = delta_phi / self.parameters['DeltaPhiMax']
         else:
             prey_prob = 1
-        if random.random() < prey_prob:
+        if rng.random() < prey_prob:
             if 0 < self.appetite < herb.weight:
                 carn_portion = self.appetite
             else:
@@ -64,12 +64,10 @@ class Graphics:
 
         if img_dir is not None:
             self._img_base = os.path.join(img_dir, img_name)
-            if not os.path.isdir(img_dir):
-                os.mkdir(img_dir)
+            os.makedirs(img_dir, exist_ok=True)
         else:
             self._img_base = os.path.join(_DEFAULT_GRAPHICS_DIR, img_name)
-            if not os.path.isdir(_DEFAULT_GRAPHICS_DIR):
-                os.mkdir(_DEFAULT_GRAPHICS_DIR)
+            os.makedirs(_DEFAULT_GRAPHICS_DIR, exist_ok=True)
 
         self._img_fmt = img_fmt if img_fmt is not None else _DEFAULT_IMG_FORMAT
 
@@ -5,10 +5,43 @@ Module implementing the island itself.
 from biosim.landscape import Lowland, Highland, Desert, Water
 from biosim.animals import Herbivore, Carnivore
 
+import multiprocessing
+import os
 import random
 import numpy as np
 
 
+def _init_worker(animal_params, landscape_params):
+    """
+    Initializer for worker processes in the pool used by :meth:`Island.annual_cycle_island`.
+    Copies the class parameters of the parent process into the worker, so parameters
+    set before the pool was created are also used in the worker.
+
+    :param animal_params: parameters for each animal class, with class as key.
+    :type animal_params: dict
+    :param landscape_params: parameters for each landscape class, with class as key.
+    :type landscape_params: dict
+    """
+    for params in (animal_params, landscape_params):
+        for cls, cls_params in params.items():
+            cls.parameters.update(cls_params)
+
+
+def _pre_migration_step(task):
+    """
+    Runs the pre migration cycle for one cell in a worker process.
+
+    :param task: tuple with location and cell.
+    :type task: tuple
+
+    :return: location and the updated cell.
+    :rtype: tuple
+    """
+    loc, cell = task
+    cell.pre_migration_cycle()
+    return loc, cell
+
+
 class Island:
     """
     Class representing the entire island.
@@ -42,6 +75,8 @@ class Island:
             -----
         """
         self.map = self.createmap(geogr)
+        self._counts = None
+        self._find_active_cells()
 
     def createmap(self, geogr=None):
         """
@@ -100,6 +135,40 @@ class Island:
                                          f'* W - Water')
         return island_map
 
+    def seed_cells(self, seed):
+        """
+        Gives each habitable cell on the map its own random number generators.
+        The seeds for the cells are derived from the given seed with
+        :class:`numpy.random.SeedSequence`, so the cells get independent random streams.
+        Each cell spawns one seed sequence for rng and one for np_rng, so the two
+        generators of a cell are independent too. Water cells have no generators.
+
+        :param seed: seed for the island.
+        :type seed: int
+        """
+        habitable_cells = [cell for cell in self.map.values() if cell.habitability is True]
+        seed_sequences = np.random.SeedSequence(seed).spawn(len(habitable_cells))
+        for cell, seed_sequence in zip(habitable_cells, seed_sequences):
+            rng_sequence, np_rng_sequence = seed_sequence.spawn(2)
+            cell.rng = random.Random(int(rng_sequence.generate_state(1)[0]))
+            cell.np_rng = np.random.default_rng(np_rng_sequence)
+
+    def _find_active_cells(self):
+        """
+        Makes a list of the habitable cells with their location and neighbouring cells.
+        The annual cycle only runs through these, so water cells are skipped
+        and the neighbours are not looked up every year.
+        Has to be called again if cells in the map are replaced.
+        """
+        self._active_cells = []
+        for loc, cell in self.map.items():
+            if cell.habitability is True:
+                neighbours = [self.map[(loc[0]-1, loc[1])],
+                              self.map[(loc[0]+1, loc[1])],
+                              self.map[(loc[0], loc[1]+1)],
+                              self.map[(loc[0], loc[1]-1)]]
+                self._active_cells.append((loc, cell, neighbours))
+
     def place_population(self, populations):
         """
         Places a population on the map based on its stated location.
@@ -121,11 +190,19 @@ class Island:
 
             Island().place_population(herbivores)
 
+        The same population can be given with arrays of ages and weights::
+
+            herbivores = [{'loc': (2, 2),
+                           'pop': [{'species': 'Herbivore',
+                                    'ages': np.full(200, 5),
+                                    'weights': np.full(200, 20)}]}]
+
         """
         for population in populations:
             loc = population['loc']
             if loc in self.map.keys():
                 cell = self.map[loc]
+                self._counts = None
                 cell.add_population(population['pop'])
             else:
                 raise ValueError(f'The stated location {loc} is outside the map boundaries')
@@ -152,6 +229,41 @@ class Island:
         landscape = self.parameters[landscape]
         landscape.set_parameters(new_params=params)
 
+    def _count_animals(self):
+        """
+        Counts the animals per species, both in total and per cell, in one pass over the map.
+        The counts are cached until the populations on the island change through
+        :meth:`place_population`, :meth:`island_migration` or :meth:`annual_cycle_island`.
+        Code changing the populations of the cells in :attr:`map` directly must call
+        :meth:`invalidate_counts` afterwards.
+
+        The arrays with counts per cell are read-only, since they are shared by all callers
+        until the counts change.
+
+        :return: herbivore count, carnivore count and 2D-arrays with counts per cell.
+        :rtype: tuple
+        """
+        if self._counts is None:
+            map_dim = list(self.map.keys())[-1]
+            herb_matrix = np.zeros(map_dim, dtype=np.int32)
+            carn_matrix = np.zeros(map_dim, dtype=np.int32)
+            for loc, cell in self.map.items():
+                herb_matrix[loc[0] - 1][loc[1] - 1] = cell.get_num_herbs()
+                carn_matrix[loc[0] - 1][loc[1] - 1] = cell.get_num_carns()
+            herb_matrix.setflags(write=False)
+            carn_matrix.setflags(write=False)
+            self._counts = (int(herb_matrix.sum()), int(carn_matrix.sum()),
+                            herb_matrix, carn_matrix)
+        return self._counts
+
+    def invalidate_counts(self):
+        """
+        Discards the cached animal counts, so they are counted again when next asked for.
+        Call it after changing the populations of the cells in :attr:`map` directly.
+
+        """
+        self._counts = None
+
     def get_number_of_herbs(self):
         """
         Calculates the number of herbivores in total on the island.
@@ -160,12 +272,7 @@ class Island:
         :rtype: int
 
         """
-        herb_count = 0
-
-        for cell in self.map.values():
-            herb_count += cell.get_num_herbs()
-
-        return herb_count
+        return self._count_animals()[0]
 
     def get_number_of_carns(self):
         """
@@ -174,119 +281,121 @@ class Island:
         :return: number of carnivores on the island.
         :rtype: int
         """
-        carn_count = 0
-
-        for cell in self.map.values():
-            carn_count += cell.get_num_carns()
-
-        return carn_count
+        return self._count_animals()[1]
 
     def get_number_herbs_per_cell(self):
         """
         Calculates the number of herbivores per cell on the map.
 
-        :return: 2D-array with herbivorecount per cell as values
+        :return: read-only 2D-array of int32 with herbivorecount per cell as values
         :rtype: array
 
         """
-
-        map_dim = list(self.map.keys())[-1]
-        herb_matrix = np.zeros(map_dim)
-        for loc, cell in self.map.items():
-            herb_matrix[loc[0]-1][loc[1]-1] = cell.get_num_herbs()
-        return herb_matrix
+        return self._count_animals()[2]
 
     def get_number_carns_per_cell(self):
         """
         Calculates the number of carnivores per cell on the map.
 
-        :return: 2D-array with carnivorecount per cell as values
+        :return: read-only 2D-array of int32 with carnivorecount per cell as values
         :rtype: array
 
         """
-        map_dim = list(self.map.keys())[-1]
-        carn_matrix = np.zeros(map_dim)
-        for loc, cell in self.map.items():
-            carn_matrix[loc[0] - 1][loc[1] - 1] = cell.get_num_carns()
-        return carn_matrix
+        return self._count_animals()[3]
 
-    def get_herbs_fitness(self):
+    def get_animal_properties(self):
         """
-        Makes list of alle the fitnessvalues for the islands herbivore population
+        Makes lists of the fitness-, age- and weight-values for both species in one pass
+        over the island, instead of one pass per property and species.
 
-        :return: list with values for fitness
-        :rtype: list
+        :return: dictionary with property as key, and a dictionary with a list of values
+                 per species as value.
+        :rtype: dict
         """
-        herbivores_fitness = []
+        properties = {prop: {'Herbivore': [], 'Carnivore': []}
+                      for prop in ('fitness', 'age', 'weight')}
+        fitness, age, weight = properties['fitness'], properties['age'], properties['weight']
         for cell in self.map.values():
-            for herb in cell.herb_pop:
-                herbivores_fitness.append(herb.fitness)
-        return herbivores_fitness
+            for species, population in (('Herbivore', cell.herb_pop), ('Carnivore', cell.carn_pop)):
+                for animal in population:
+                    fitness[species].append(animal.fitness)
+                    age[species].append(animal.age)
+                    weight[species].append(animal.weight)
+        return properties
+
+    def _get_animal_values(self, population, attribute, dtype=float):
+        """
+        Makes an array of an attribute for all animals in one of the populations of the cells.
+        The array is allocated once with the exact size, instead of growing a list.
+
+        :param population: name of the population in the cells, 'herb_pop' or 'carn_pop'.
+        :type population: str
+        :param attribute: name of the animal attribute, e.g. 'fitness'.
+        :type attribute: str
+        :param dtype: data type of the values, int for 'age'.
+        :type dtype: type
+
+        :return: array with the attribute values.
+        :rtype: array
+        """
+        populations = [getattr(cell, population) for cell in self.map.values()]
+        count = sum(len(pop) for pop in populations)
+        return np.fromiter((getattr(animal, attribute) for pop in populations for animal in pop),
+                           dtype=dtype, count=count)
+
+    def get_herbs_fitness(self):
+        """
+        Makes array of all the fitnessvalues for the islands herbivore population
+
+        :return: array with values for fitness
+        :rtype: array
+        """
+        return self._get_animal_values('herb_pop', 'fitness')
 
     def get_carns_fitness(self):
         """
-        Makes list of all the fitnessvalues for the islands carnivore population
+        Makes array of all the fitnessvalues for the islands carnivore population
 
-        :return: list with values for fitness
-        :rtype: list
+        :return: array with values for fitness
+        :rtype: array
         """
-        carnivores_fitness = []
-        for cell in self.map.values():
-            for carn in cell.carn_pop:
-                carnivores_fitness.append(carn.fitness)
-        return carnivores_fitness
+        return self._get_animal_values('carn_pop', 'fitness')
 
     def get_herbs_age(self):
         """
-        Makes list of all the age-values for the islands herbivore population
+        Makes array of all the age-values for the islands herbivore population
 
-        :return: list with values for age
-        :rtype: list
+        :return: array with values for age
+        :rtype: array
         """
-        herbivores_age = []
-        for cell in self.map.values():
-            for herb in cell.herb_pop:
-                herbivores_age.append(herb.age)
-        return herbivores_age
+        return self._get_animal_values('herb_pop', 'age', dtype=int)
 
     def get_carns_age(self):
         """
-        Makes list of all the age-values for the islands carnivore population
+        Makes array of all the age-values for the islands carnivore population
 
-        :return: list with values for age
-        :rtype: list
+        :return: array with values for age
+        :rtype: array
         """
-        carnivores_age = []
-        for cell in self.map.values():
-            for carn in cell.carn_pop:
-                carnivores_age.append(carn.age)
-        return carnivores_age
+        return self._get_animal_values('carn_pop', 'age', dtype=int)
 
     def get_herbs_weight(self):
         """
-        Makes list of all the weight-values for the islands herbivore population
+        Makes array of all the weight-values for the islands herbivore population
 
-        :return: list with values for weight
-        :rtype: list
+        :return: array with values for weight
+        :rtype: array
         """
-        herbivores_weight = []
-        for cell in self.map.values():
-            for herb in cell.herb_pop:
-                herbivores_weight.append(herb.weight)
-        return herbivores_weight
+        return self._get_animal_values('herb_pop', 'weight')
 
     def get_carns_weight(self):
         """
-        Makes list of all the weight-values for the islands carnivore population
+        Makes array of all the weight-values for the islands carnivore population
 
-        :return: list with values for weight
-        :rtype: list
+        :return: array with values for weight
+        :rtype: array
         """
-        carnivores_weight = []
-        for cell in self.map.values():
-            for carn in cell.carn_pop:
-                carnivores_weight.append(carn.weight)
-        return carnivores_weight
+        return self._get_animal_values('carn_pop', 'weight')
 
     def island_migration(self):
         """
@@ -299,53 +408,86 @@ class Island:
         cells migrant population. Lastly, it adds the migrators to
         their cell's population.
 
+        The neighbouring cells for all migrators in a cell are drawn at once
+        with the cell's numpy generator.
+
         """
-        for loc, cell in self.map.items():
-            if cell.classname == 'Water':
+        for loc, cell, neighbours in self._active_cells:
+            migrators_herb, migrators_carn = cell.animal_migration()
+            migrators = migrators_herb + migrators_carn
+            if not migrators:
                 continue
-            else:
-                neighbours = [self.map[(loc[0]-1, loc[1])],
-                              self.map[(loc[0]+1, loc[1])],
-                              self.map[(loc[0], loc[1]+1)],
-                              self.map[(loc[0], loc[1]-1)]]
 
-                migrators_herb, migrators_carn = cell.animal_migration()
+            destinations = cell.np_rng.integers(len(neighbours), size=len(migrators))
+            for migrator, destination in zip(migrators, destinations.tolist()):
+                migration_cell = neighbours[destination]
+                if migration_cell.habitability is False:
+                    migration_cell = cell
+                migration_cell.register_migrants(migrator=migrator)
 
-                for herb in migrators_herb:
-                    migration_cell = random.choice(neighbours)
-                    if migration_cell.classname == 'Water':
-                        cell.migrating_herbs.append(herb)
-                    else:
-                        migration_cell.register_migrants(migrator=herb)
+        for loc, cell, neighbours in self._active_cells:
+            cell.add_migraters_to_pop()
+        self._counts = None
 
-                for carn in migrators_carn:
-                    migration_cell = random.choice(neighbours)
-                    if migration_cell.classname == 'Water':
-                        cell.migrating_carns.append(carn)
-                    else:
-                        migration_cell.register_migrants(migrator=carn)
+    def make_pool(self, processes=None):
+        """
+        Creates a pool of worker processes for running the pre migration cycle
+        of the cells in parallel, see :meth:`annual_cycle_island`.
+        The current animal and landscape parameters are copied into the workers,
+        so parameters must be set before the pool is created.
 
-        for loc, cell in self.map.items():
-            if cell.classname == 'Water':
-                continue
-            else:
-                cell.add_migraters_to_pop()
+        :param processes: number of worker processes, all cpu's are used if None.
+        :type processes: int or None
 
-    def annual_cycle_island(self):
+        :return: pool of worker processes.
+        :rtype: multiprocessing.pool.Pool
+        """
+        animal_params = {type(animal): animal.parameters.copy()
+                         for animal in self.sample_animals.values()}
+        landscape_params = {type(landscape): landscape.parameters.copy()
+                            for landscape in self.parameters.values()}
+        return multiprocessing.Pool(processes=processes, initializer=_init_worker,
+                                    initargs=(animal_params, landscape_params))
+
+    def annual_cycle_island(self, pool=None, processes=None):
         """
         Method running the annual cycle of the ecosystem on the island.
         In pre migration all cells regrow fodder,
         herbivores eat, carnivores eat and the breeding season plays out.
         Then the migrating animals migrate.
         Lastly, in post migration the animals age, lose weight and some die.
-        """
-        for cell in self.map.values():
-            cell.pre_migration_cycle()
+        Water cells are skipped, since no animals live there.
+
+        The pre migration cycle only depends on the animals within each cell.
+        If a pool from :meth:`make_pool` is given, the cells are sent to the
+        worker processes, and the state of each updated cell is copied back into
+        the cell in the map. The cells in the map are kept, so the list of active cells
+        and their neighbours stays valid.
+        Each cell brings its own random number generator, so a seeded simulation is
+        reproducible regardless of which worker handles the cell.
+
+        :param pool: pool of worker processes, the cycle runs serially if None.
+        :type pool: multiprocessing.pool.Pool or None
+        :param processes: number of worker processes in the pool, used to split the cells
+                          into chunks. All cpu's are assumed if None, as in :meth:`make_pool`.
+        :type processes: int or None
+        """
+        if pool is None:
+            for loc, cell, neighbours in self._active_cells:
+                cell.pre_migration_cycle()
+        else:
+            tasks = [(loc, cell) for loc, cell, neighbours in self._active_cells]
+            processes = processes or os.cpu_count() or 1
+            chunksize = max(1, len(tasks) // (4 * processes))
+            for loc, cell in pool.imap_unordered(_pre_migration_step, tasks,
+                                                 chunksize=chunksize):
+                vars(self.map[loc]).update(vars(cell))
 
         self.island_migration()
 
-        for cell in self.map.values():
+        for loc, cell, neighbours in self._active_cells:
             cell.post_migration_cycle()
+        self._counts = None
 
     def _clean_island_for_herbs(self):
         """
@@ -353,3 +495,4 @@ class Island:
         """
         for cell in self.map.values():
             cell.herb_pop.clear()
+        self.invalidate_counts()
@@ -3,6 +3,7 @@ Module implementing the landscape on the island,
 using the Landscape superclass.
 """
 import random
+import numpy as np
 
 from biosim.animals import Herbivore, Carnivore
 
@@ -38,14 +39,24 @@ class Landscape:
 
         cls.parameters.update(new_params)
 
-    def __init__(self, herb_pop=None, carn_pop=None):
+    def __init__(self, herb_pop=None, carn_pop=None, rng=None):
         """
         Initializing Landscape objects.
 
+        Each landscape has its own random number generator, used for all random events
+        in the cell. This keeps the cells independent of each other, so they can be
+        updated in any order or in separate processes and still be reproducible.
+        Events decided for the whole population at once (births, migration and death)
+        draw from a NumPy generator, np_rng, seeded from rng.
+        Water cells get no generators, since no animals live there.
+
         :param herb_pop: list containing the herbivore population
         :type herb_pop: list
         :param carn_pop: list containing the carnivore population
         :type carn_pop: list
+        :param rng: random number generator for the cell. If None, it is
+                    seeded from the :mod:`random` module.
+        :type rng: random.Random
 
         """
         self.classname = self.__class__.__name__
@@ -56,6 +67,12 @@ class Landscape:
         self.carn_pop = carn_pop if carn_pop is not None else []
         self.migrating_carns = []
         self.habitability = True if type(self) is not Water else False
+        if self.habitability:
+            self.rng = rng if rng is not None else random.Random(random.getrandbits(64))
+            self.np_rng = np.random.default_rng(self.rng.getrandbits(64))
+        else:
+            self.rng = None
+            self.np_rng = None
 
     def add_population(self, animals):
         """
@@ -66,19 +83,50 @@ class Landscape:
 
         :param animals: list containing dictionaries with
                         animal information about species, age and weight.
+                        A dictionary can also describe many animals of one species
+                        with arrays under the keys 'ages' and 'weights'.
+                        Animals with both age and weight given are made in batches with
+                        :meth:`Animals.from_array`. If age or weight is None, the animal is
+                        made on its own, with age 0 or a birth weight drawn with the cell's rng.
         :type animals: list
 
         """
         if self.habitability is True:
+            species_classes = {'Herbivore': Herbivore, 'Carnivore': Carnivore}
+            populations = {Herbivore: self.herb_pop, Carnivore: self.carn_pop}
+            batches = {Herbivore: ([], []), Carnivore: ([], [])}
+
+            def add_batch(species):
+                """
+                Adds the animals collected for species to the population, and empties the batch.
+
+                :param species: the class of the animals in the batch.
+                :type species: class
+
+                """
+                ages, weights = batches[species]
+                populations[species].extend(species.from_array(ages, weights))
+                ages.clear()
+                weights.clear()
+
             for animal in animals:
-                age = animal['age']
-                weight = animal['weight']
-                if animal['species'] == 'Herbivore':
-                    self.herb_pop.append(Herbivore(age=age, weight=weight))
-                elif animal['species'] == 'Carnivore':
-                    self.carn_pop.append(Carnivore(age=age, weight=weight))
-                else:
+                if animal['species'] not in species_classes:
                     raise KeyError('Species must be either Herbivore or Carnivore')
+                species = species_classes[animal['species']]
+                ages, weights = batches[species]
+                if 'ages' in animal:
+                    ages.extend(np.asarray(animal['ages']).tolist())
+                    weights.extend(np.asarray(animal['weights']).tolist())
+                elif animal['age'] is None or animal['weight'] is None:
+                    # Keeps the order of the animals by adding the batch so far first
+                    add_batch(species)
+                    populations[species].append(species(age=animal['age'], weight=animal['weight'],
+                                                        rng=self.rng))
+                else:
+                    ages.append(animal['age'])
+                    weights.append(animal['weight'])
+            for species in batches:
+                add_batch(species)
         else:
             raise ValueError('Population cannot be placed in water')
 
@@ -118,6 +166,19 @@ class Landscape:
         else:
             raise ValueError(f'Decreasing has to be a bool! Not a {type(decreasing)}')
 
+    def draw_events(self, probabilities):
+        """
+        Decides for a whole population at once which animals a random event happens to,
+        using one vectorized draw instead of one draw per animal.
+
+        :param probabilities: probability of the event for each animal in the population.
+        :type probabilities: list
+
+        :return: array with True for the animals the event happens to.
+        :rtype: array
+        """
+        return self.np_rng.random(len(probabilities)) < np.asarray(probabilities, dtype=float)
+
     def regrowth(self):
         """
         Regrows fodder to f_max in Low- and Highlands.
@@ -149,21 +210,20 @@ class Landscape:
         A carnivore tries to kill until it has attempted to kill each herbivore
         in the cell or it no longer has an appetite. Surviving herbivores is added back to the
         herbivore population by the end of each carnivores' hunting season.
+
+        Herbivore fitness does not change while the carnivores hunt, and the survivors
+        keep their order, so the herbivores only need to be sorted once.
+        Cells without carnivores are left unsorted.
         """
-        random.shuffle(self.carn_pop)
+        self.rng.shuffle(self.carn_pop)
+        if self.carn_pop:
+            self.sort_herbs_by_fitness(decreasing=False)
 
         for carn in self.carn_pop:
             carn.regain_appetite()
             if len(self.herb_pop) > 0 and carn.appetite > 0:
-                self.sort_herbs_by_fitness(decreasing=False)
-                survivors = []
-                for herb in self.herb_pop:
-                    if carn.carnivore_feeding(herb) is False:
-                        survivors.append(herb)
-                self.herb_pop = survivors.copy()
-
-            else:
-                continue
+                self.herb_pop = [herb for herb in self.herb_pop
+                                 if carn.carnivore_feeding(herb, rng=self.rng) is False]
 
     def reproduction(self):
         """
@@ -171,6 +231,9 @@ class Landscape:
         It extends the populations with a list of newborns.
 
         """
+        rng = self.rng
+        draw_events = self.draw_events
+
         def newborn_pop(population):
             """
             Generates a list of newborn animal objects based on
@@ -185,11 +248,13 @@ class Landscape:
             """
             # noinspection PyPep8Naming
             pop_size = len(population)
+            pregnant = draw_events([parent.birth_probability(pop_size) for parent in population])
             newborns = []
-            for parent in population:
-                newborn = parent.gives_birth(pop_size)
-                if newborn is not False:
-                    newborns.append(newborn)
+            for parent, is_pregnant in zip(population, pregnant):
+                if is_pregnant:
+                    newborn = parent.birth(rng=rng)
+                    if newborn is not False:
+                        newborns.append(newborn)
             return newborns
 
         self.herb_pop.extend(newborn_pop(self.herb_pop))
@@ -208,16 +273,18 @@ class Landscape:
         migrators_carn = []
         staying_herbs = []
         staying_carns = []
-        for herb in self.herb_pop:
-            if herb.migrate() is True:
+        migrates = self.draw_events([herb.migration_probability() for herb in self.herb_pop])
+        for herb, herb_migrates in zip(self.herb_pop, migrates):
+            if herb_migrates:
                 migrators_herb.append(herb)
             else:
                 staying_herbs.append(herb)
 
         self.herb_pop = staying_herbs.copy()
 
-        for carn in self.carn_pop:
-            if carn.migrate() is True:
+        migrates = self.draw_events([carn.migration_probability() for carn in self.carn_pop])
+        for carn, carn_migrates in zip(self.carn_pop, migrates):
+            if carn_migrates:
                 migrators_carn.append(carn)
             else:
                 staying_carns.append(carn)
@@ -275,18 +342,30 @@ class Landscape:
     def population_death(self):
         """
         Updates the population due to annual death amongst animals.
+        The death probabilities come from :meth:`Animals.death_probability`,
+        and the deaths are drawn for the whole population at once.
 
         """
-        surviving_herbs = []
-        surviving_carns = []
-        for herb in self.herb_pop:
-            if herb.dies() is not True:
-                surviving_herbs.append(herb)
-        for carn in self.carn_pop:
-            if carn.dies() is not True:
-                surviving_carns.append(carn)
-        self.herb_pop = surviving_herbs  # .copy() ??
-        self.carn_pop = surviving_carns
+        draw_events = self.draw_events
+
+        def survivors(population):
+            """
+            Returns the animals in the population that survive the year.
+
+            :param population: A list of animal objects.
+            :type population: list
+
+            :return: list of surviving animal objects.
+            :rtype: list
+
+            """
+            death_prob = np.fromiter((animal.death_probability() for animal in population),
+                                     dtype=float, count=len(population))
+            dies = draw_events(death_prob)
+            return [animal for animal, animal_dies in zip(population, dies) if not animal_dies]
+
+        self.herb_pop = survivors(self.herb_pop)
+        self.carn_pop = survivors(self.carn_pop)
 
     def pre_migration_cycle(self):
         """
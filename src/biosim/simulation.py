@@ -6,11 +6,74 @@ Module implementing the simulation of the ecosystem through the BioSim class.
 # https://opensource.org/licenses/BSD-3-Clause
 # (C) Copyright 2021 Hans Ekkehard Plesser / NMBU
 
+from biosim import __version__
 from biosim.island import Island
 from biosim.graphics import Graphics
+import functools
+import hashlib
+import numpy as np
+import os
+import pickle
+import random
+import tempfile
 import textwrap
 import warnings
 
+# Simulations without graphics are cached to this directory when the
+# environment variable BIOSIM_CACHE is set to 1.
+_CACHE_DIR = os.path.join('~', '.biosim_cache')
+
+# Version of the layout of the cache files, increase it when the layout changes.
+_CACHE_FORMAT = 1
+
+
+def _persistent_cache(simulate):
+    """
+    Decorator caching the island after a simulation to disk.
+
+    The cache key is the pickled island, the state of :mod:`random`, all animal
+    and landscape parameters, the number of years, the biosim version and the cache format,
+    so a cached result is only used when the simulation would have given the same island.
+    The state of :mod:`random` after the simulation is stored together with the island.
+    The cache file is written to a temporary file first and then moved into place,
+    so a simulation reading the cache never sees a partly written file.
+
+    Only used when the environment variable BIOSIM_CACHE is 1 and vis_years is 0.
+    """
+    @functools.wraps(simulate)
+    def wrapper(self, num_years):
+        if os.environ.get('BIOSIM_CACHE') != '1' or self.vis_years != 0:
+            return simulate(self, num_years)
+
+        island = self.island
+        key_data = (__version__, _CACHE_FORMAT, island, random.getstate(), num_years,
+                    [animal.parameters for animal in island.sample_animals.values()],
+                    [landscape.parameters for landscape in island.parameters.values()])
+        key = hashlib.blake2b(pickle.dumps(key_data)).hexdigest()
+        cache_path = os.path.join(os.path.expanduser(_CACHE_DIR), f'{key}.pkl')
+
+        if os.path.isfile(cache_path):
+            with open(cache_path, 'rb') as cache_file:
+                self.island, random_state = pickle.load(cache_file)
+            random.setstate(random_state)
+            self.step += num_years
+            self.final_step = self.step
+            return
+
+        simulate(self, num_years)
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile('wb', dir=cache_dir, suffix='.tmp',
+                                         delete=False) as cache_file:
+            pickle.dump((self.island, random.getstate()), cache_file)
+        try:
+            os.replace(cache_file.name, cache_path)
+        except OSError:
+            os.remove(cache_file.name)
+            raise
+
+    return wrapper
+
 
 class BioSim:
     """
@@ -18,7 +81,7 @@ class BioSim:
     """
     def __init__(self, island_map, ini_pop, seed,
                  vis_years=1, ymax_animals=None, cmax_animals=None, hist_specs=None,
-                 img_dir=None, img_base=None, img_fmt='png', img_years=None):
+                 img_dir=None, img_base=None, img_fmt='png', img_years=None, processes=1):
 
         """
 
@@ -33,6 +96,7 @@ class BioSim:
         :param img_base: String with beginning of file name for figures
         :param img_fmt: String with file type for figures, e.g. 'png'
         :param img_years: years between visualizations saved to files (default: vis_years)
+        :param processes: number of worker processes for the pre migration cycle (1: no workers)
 
         If ymax_animals is None, the y-axis limit should be adjusted automatically.
         If cmax_animals is None, sensible, fixed default values should be used.
@@ -53,6 +117,10 @@ class BioSim:
 
         img_dir and img_base must either be both None or both strings.
 
+        If processes is larger than 1, the cells are updated in parallel up to migration,
+        see :meth:`island.Island.annual_cycle_island`. The worker pool is created at the start
+        of each call to :meth:`simulate` and closed when the simulation is done.
+
         example
         -------
         ::
@@ -60,10 +128,12 @@ class BioSim:
             sim = BioSim(island_map = geogr, ini_pop = population img_dir='results')
         """
         self.island_geographie = textwrap.dedent(island_map)
+        self.seed = seed
+        random.seed(seed)
         self.island = Island(geogr=self.island_geographie)
+        self.island.seed_cells(seed)
         self.add_population(population=ini_pop)
         self.graphics = Graphics(img_dir, img_name=img_base, img_fmt=img_fmt)
-        self.seed = seed
         self.ymax_animals = ymax_animals if ymax_animals is not None else 20000
         self.cmax_animals = {'Herbivore': 200,
                              'Carnivore': 200}
@@ -91,6 +161,8 @@ class BioSim:
             if img_years % vis_years != 0:
                 raise ValueError('img_steps must be a multiple of vis_steps')
 
+        self.processes = processes
+
         self.step = 0
         self.final_step = None
 
@@ -117,40 +189,80 @@ class BioSim:
         Run simulations with or without graphics (see vis_years constraints).
         Passes graphics parameters to the graphics module in order to visualize.
 
-        :param num_years: number of years to simulate, must be integer.
+        Set the environment variable BIOSIM_CACHE to 1 to cache simulations without
+        graphics to disk, so rerunning an identical simulation loads the result.
+
+        :param num_years: number of years to simulate, must be a non-negative integer.
         :type num_years: int
 
+        """
+        if isinstance(num_years, bool) or not isinstance(num_years, (int, np.integer)):
+            raise ValueError(f'num_years must be an int, got {type(num_years).__name__}')
+        if num_years < 0:
+            raise ValueError(f'num_years must be non-negative, got {num_years}')
+        if self.vis_years == 0:
+            warnings.warn("Warning: Simulation running without graphics due to vis_years is 0")
+
+        self._simulate(num_years)
+
+    @_persistent_cache
+    def _simulate(self, num_years):
+        """
+        Runs the simulation for :meth:`simulate` after the input is checked,
+        with the worker pool if more than one process is used.
+        The result is cached to disk when BIOSIM_CACHE is 1, see :func:`_persistent_cache`.
+
+        :param num_years: number of years to simulate.
+        :type num_years: int
         """
         self.final_step = self.step + num_years
-        if self.vis_years != 0:
-            num_simulations = num_years
+        pool = self.island.make_pool(self.processes) if self.processes > 1 else None
+        try:
+            self._run_years(pool)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+    def _run_years(self, pool):
+        """
+        Runs the annual cycles up to the final step, see :meth:`simulate`.
+
+        :param pool: pool of worker processes, or None to run serially.
+        :type pool: multiprocessing.pool.Pool or None
+        """
+        if self.vis_years == 0:
+            # No visualization year is reached before the final step.
+            vis_years = self.final_step + 1
+        else:
             self.graphics.setup(final_step=self.final_step, img_step=self.img_years,
                                 vis_years=self.vis_years, island_geographie=self.island_geographie,
                                 ymax_animals=self.ymax_animals,
                                 hist_specs=self.hist_specs)
-            if num_simulations // 1 == num_simulations:
-                while self.step < self.final_step:
-                    self.island.annual_cycle_island()
-                    self.step += 1
-
-                    if self.step % self.vis_years == 0:
-                        self.graphics.update(year=self.step, species_count=self.num_animals_per_species,
-                                             cmax_animals=self.cmax_animals,
-                                             animal_matrix=self.num_animals_per_species_per_cell,
-                                             animal_fitness_per_species=self.animal_fitness_per_species,
-                                             animal_age_per_species=self.animal_age_per_species,
-                                             animal_weight_per_species=self.animal_weight_per_species)
-            else:
-                raise ValueError(f'Num_years has to be an integer, not a {type(num_years)}')
-        else:
-            warnings.warn("Warning: Simulation running without graphics due to vis_years is 0")
-            num_simulations = num_years
-            if num_simulations // 1 == num_simulations:
-                while self.step < self.final_step:
-                    self.island.annual_cycle_island()
-                    self.step += 1
-            else:
-                raise ValueError(f'Num_years has to be an integer, not a {type(num_years)}')
+            vis_years = self.vis_years
+
+        cycle = self.island.annual_cycle_island
+        processes = self.processes
+        update = self.graphics.update
+        cmax_animals = self.cmax_animals
+        step, final_step = self.step, self.final_step
+        while step < final_step:
+            # Runs the years up to the next visualization year without checking
+            # for graphics updates every year.
+            block = min(vis_years - step % vis_years, final_step - step)
+            for _ in range(block):
+                cycle(pool=pool, processes=processes)
+            step += block
+            self.step = step
+
+            if step % vis_years == 0:
+                properties = self.island.get_animal_properties()
+                update(year=step, species_count=self.num_animals_per_species,
+                       cmax_animals=cmax_animals,
+                       animal_matrix=self.num_animals_per_species_per_cell,
+                       animal_fitness_per_species=properties['fitness'],
+                       animal_age_per_species=properties['age'],
+                       animal_weight_per_species=properties['weight'])
 
     def add_population(self, population):
         """
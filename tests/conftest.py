@@ -0,0 +1,141 @@
+"""Shared fixtures for the BioSim test suite."""
+
+import random
+import types
+
+import numpy as np
+import pytest
+
+from biosim.animals import Herbivore, Carnivore
+from biosim.landscape import Lowland, Highland, Desert, Water
+
+SEED = 12345678  # random seed for tests
+
+
+def _restore_parameters(species, defaults):
+    """
+    Restore the class parameters of species to the known-good values in defaults.
+
+    The values come from a snapshot of the class parameters, so the validation in
+    set_parameters() is skipped.
+
+    :param species: animal or landscape class to restore.
+    :param defaults: snapshot of the class parameters.
+    :type defaults: dict
+    """
+    species.parameters.clear()
+    species.parameters.update(defaults)
+
+
+@pytest.fixture(scope='module', autouse=True)
+def default_parameters():
+    """
+    Fixture taking one snapshot of the class parameters for the animals and landscapes
+    for each test module.
+
+    The snapshot is used by the fixtures below to reset parameters after a test,
+    and the parameters are reset to the snapshot when all tests in the module are done,
+    so parameters set directly in a test do not leak into other modules.
+    The snapshots are read-only, so a test cannot change them by accident.
+    """
+    defaults = {cls: types.MappingProxyType(cls.parameters.copy())
+                for cls in (Herbivore, Carnivore, Lowland, Highland, Desert, Water)}
+    yield defaults
+    for species, parameters in defaults.items():
+        _restore_parameters(species, parameters)
+
+
+@pytest.fixture(autouse=True)
+def isolate_parameters(default_parameters):
+    """
+    Fixture resetting class parameters changed by a test when the test is done,
+    so tests can run in any order and on any pytest-xdist worker.
+
+    Parameters are only compared with the module snapshot after the test,
+    and copied back only if they were changed.
+    """
+    yield
+    for species, parameters in default_parameters.items():
+        if species.parameters != parameters:
+            _restore_parameters(species, parameters)
+
+
+@pytest.fixture(autouse=True)
+def seed_global_generators(request):
+    """
+    Fixture seeding the random module and numpy.random before each test,
+    so animals and landscapes made without their own generator are the same in every run.
+
+    pytest-randomly seeds both itself when it is installed, as in tox, with the seed
+    given by --randomly-seed, so they are only seeded here when the plugin is not active.
+    """
+    if not request.config.pluginmanager.hasplugin('randomly'):
+        random.seed(SEED)
+        np.random.seed(SEED)
+
+
+@pytest.fixture
+def set_animal_parameters(request, default_parameters):
+    """
+    Fixture setting class parameters for one animal species,
+    based on H. E. Plesser's biolab/bacteria.py
+
+    The fixture sets the species' parameters when called for setup,
+    and resets them when called for teardown. This ensures that modified
+    parameters are always reset before leaving a test.
+
+    This fixture should be called via parametrize with indirect=True.
+
+    :param request: Request object automatically provided by pytest.
+        request.param is a tuple (species, parameters), where parameters is the dictionary
+        to be passed to species.set_parameters(), e.g. (Carnivore, {'mu': 0})
+    :param default_parameters: module snapshot of the default parameters.
+    """
+    species, parameters = request.param
+    species.set_parameters(parameters)
+    yield
+    _restore_parameters(species, default_parameters[species])
+
+
+@pytest.fixture
+def set_landscape_parameters(request, default_parameters):
+    """
+    Fixture setting class parameters for one landscape type,
+    based on H. E. Plesser's biolab/bacteria.py
+
+    The fixture sets the landscape's parameters when called for setup,
+    and resets them when called for teardown. This ensures that modified
+    parameters are always reset before leaving a test.
+
+    This fixture should be called via parametrize with indirect=True.
+
+    :param request: Request object automatically provided by pytest.
+        request.param is a tuple (landscape, parameters), where parameters is the dictionary
+        to be passed to landscape.set_parameters(), e.g. (Lowland, {'f_max': 200})
+    :param default_parameters: module snapshot of the default parameters.
+    """
+    landscape, parameters = request.param
+    landscape.set_parameters(parameters)
+    yield
+    _restore_parameters(landscape, default_parameters[landscape])
+
+
+@pytest.fixture
+def rng():
+    """
+    Fixture with a new seeded random number generator for each test.
+    Pass it to the animal methods taking rng, instead of seeding the random module.
+    """
+    return random.Random(SEED)
+
+
+@pytest.fixture
+def herbivore():
+    """ Fixture fixing a herbivore, with its birth weight drawn from a seeded generator."""
+    return Herbivore(rng=random.Random(SEED))
+
+
+@pytest.fixture
+def carnivore():
+    """ Fixture fixing a carnivore, with its birth weight drawn from a seeded generator."""
+    return Carnivore(rng=random.Random(SEED))
@@ -1,67 +1,34 @@
 """Tests for the Animal superclass with associated subclasses."""
 
+import math
+import random
+
+import numpy as np
 import pytest
-import scipy.stats as stats
+from scipy.special import ndtr
 
-from biosim.animals import *
+from biosim.animals import Herbivore, Carnivore
+from conftest import SEED
 
 # Overall parameters for probabilistic tests
-SEED = 12345678  # random seed for tests
 ALPHA = 0.01  # significance level for statistical tests
 
 
-@pytest.fixture
-def set_herbivore_parameters(request):
-    """
-    Fixture setting class parameters for Herbivore, based on H. E. Plesser's biolab/bacteria.py
-
-    The fixture sets Herbivore parameters when called for setup,
-    and resets them when called for teardown. This ensures that modified
-    parameters are always reset before leaving a test.
-
-    This fixture should be called via parametrize with indirect=True.
-
-    :param request: Request object automatically provided by pytest.
-        request.param is the parameter dictionary to be passed to
-        Herbivore.set_parameters()
-    """
-    default_parameters = Herbivore.parameters.copy()
-    Herbivore.set_parameters(request.param)
-    yield
-    Herbivore.set_parameters(default_parameters)
-
-
-@pytest.fixture
-def set_carnivore_parameters(request):
-    """
-    Fixture setting class parameters for Carnivore, based on H. E. Plesser's biolab/bacteria.py.
-
-    The fixture sets Carnivore parameters when called for setup,
-    and resets them when called for teardown. This ensures that modified
-    parameters are always reset before leaving a test.
-
-    This fixture should be called via parametrize with indirect=True.
-
-    :param request: Request object automatically provided by pytest.
-    request.param is the parameter dictionary to be passed to
-    Carnivore.set_parameters()
-    """
-    default_parameters = Carnivore.parameters.copy()
-    Carnivore.set_parameters(request.param)
-    yield
-    Carnivore.set_parameters(default_parameters)
+class FixedRandom(random.Random):
+    """ Random number generator where random() always returns the same value."""
 
+    def __init__(self, value):
+        super().__init__(SEED)
+        self.value = value
 
-@pytest.fixture
-def carnivore():
-    """ Fixture fixing a carnivore."""
-    return Carnivore()
+    def random(self):
+        return self.value
 
 
 @pytest.fixture
-def herbivore():
-    """ Fixture fixing a herbivore."""
-    return Herbivore()
+def zero_rng():
+    """ Fixture with a generator where random() always returns 0, so every event happens."""
+    return FixedRandom(0)
 
 
 def test_input_param(carnivore):
@@ -130,85 +97,87 @@ def test_fitness_values_expected(carnivore):
     Using age = a_half and weight = weight_half. This should return a fitness of 1/4 (q_pos x q_neg = 1/2 * 1/2),
     see update_fitness() in animals.py for formula.
     """
-    carnivore.update_age(years=carnivore.parameters['a_half'])
-    carnivore.set_weight(new_weight=carnivore.parameters['w_half'])
+    a_half, w_half = carnivore.parameters['a_half'], carnivore.parameters['w_half']
+    phi_age, phi_weight = carnivore.parameters['phi_age'], carnivore.parameters['phi_weight']
+
+    carnivore.update_age(years=a_half)
+    carnivore.set_weight(new_weight=w_half)
     carnivore.update_fitness()
 
-    q_pos = 1 / (1 + (math.exp(carnivore.parameters['phi_age'] *
-                               (carnivore.age - carnivore.parameters['a_half']))))
-    q_neg = 1 / (1 + (math.exp((-1) * carnivore.parameters['phi_weight'] *
-                               (carnivore.weight - carnivore.parameters['w_half']))))
+    q_pos = 1 / (1 + (math.exp(phi_age * (carnivore.age - a_half))))
+    q_neg = 1 / (1 + (math.exp((-1) * phi_weight * (carnivore.weight - w_half))))
+    expected_fitness = q_pos * q_neg
 
-    assert carnivore.fitness == q_pos * q_neg and q_pos * q_neg == 1/4
+    assert carnivore.fitness == pytest.approx(expected_fitness, rel=1e-12)
+    assert expected_fitness == pytest.approx(1/4, rel=1e-12)
 
 
-def test_regains_appetite(carnivore):
+def test_regains_appetite():
     """
     Testing that the regain_appetite() function successfully
     sets the animal's appetite as parameter F.
     """
+    carnivore = Carnivore(age=5, weight=20)
     carnivore.appetite = 0
     carnivore.regain_appetite()
     assert carnivore.appetite == carnivore.parameters['F']
 
 
-def test_certain_birth(mocker, carnivore):
+def test_certain_birth(zero_rng, carnivore):
     """
     Testing to ensure birth happens when conditions for birth are met.
-    random.random is set to zero and weight at 1000 to ensure
+    random() is set to zero and weight at 1000 to ensure
     the conditions of birthing an offspring are met.
     """
     num = 100
     carnivore.set_weight(new_weight=1000)
-    mocker.patch('random.random', return_value=0)
-
-    for _ in range(10):
-        assert carnivore.gives_birth(pop_size=num) is not False
+    assert carnivore.gives_birth(pop_size=num, rng=zero_rng) is not False
 
 
-@pytest.mark.parametrize('set_carnivore_parameters', [{'gamma': 0.0}], indirect=True)
-def test_no_birth(set_carnivore_parameters, carnivore):
+@pytest.mark.parametrize('set_animal_parameters', [(Carnivore, {'gamma': 0.0})], indirect=True)
+def test_no_birth(set_animal_parameters, carnivore):
     """
     If gamma is set to zero, the birth probability (gamma * fitness * (num - 1)), will be zero.
     Hence, gives_birth() will return False.
     """
     num = 100
+    assert carnivore.gives_birth(pop_size=num) is False
 
-    for _ in range(10):
-        assert carnivore.gives_birth(pop_size=num) is False
 
+def test_no_population_no_birth(zero_rng, herbivore):
+    """
+    Testing that an animal alone in a cell does not give birth,
+    since the birth probability gamma * fitness * (N - 1) is zero for N = 1.
+    """
+    herbivore.set_weight(new_weight=1000)
+    assert herbivore.gives_birth(pop_size=1, rng=zero_rng) is False
 
-@pytest.mark.parametrize('set_herbivore_parameters', [{'gamma': 100.0,
-                                                       'zeta': 100}], indirect=True)
-def test_no_birth_zeta(set_herbivore_parameters, mocker, herbivore):
+
+@pytest.mark.parametrize('set_animal_parameters', [(Herbivore, {'gamma': 100.0,
+                                                                 'zeta': 100})], indirect=True)
+def test_no_birth_zeta(set_animal_parameters, zero_rng, herbivore):
     """
     Testing birth to an offspring does not occur if the mother's weight
     is lower than zeta * (w_birth + sigma_birth).
     """
     num = 100
-    mocker.patch('random.random', return_value=0)
-
-    for _ in range(10):
-        assert herbivore.gives_birth(pop_size=num) is False
+    assert herbivore.gives_birth(pop_size=num, rng=zero_rng) is False
 
 
-@pytest.mark.parametrize('set_herbivore_parameters', [{'gamma': 100.0,
-                                                       'xi': 100}], indirect=True)
-def test_no_birth_parentweight_too_low(set_herbivore_parameters, mocker, herbivore):
+@pytest.mark.parametrize('set_animal_parameters', [(Herbivore, {'gamma': 100.0,
+                                                                 'xi': 100})], indirect=True)
+def test_no_birth_parentweight_too_low(set_animal_parameters, zero_rng, herbivore):
     """
     Testing no birth to offspring occurs if
     the parent's weight < xi * newborn's weight.
     """
-    mocker.patch('random.random', return_value=0)
     num = 200
     h = Herbivore(weight=0.01)
-
-    for _ in range(10):
-        assert h.gives_birth(pop_size=num) is False
+    assert h.gives_birth(pop_size=num, rng=zero_rng) is False
 
 
-@pytest.mark.parametrize('set_carnivore_parameters', [{'mu': 100}], indirect=True)
-def test_certain_migration(set_carnivore_parameters, carnivore):
+@pytest.mark.parametrize('set_animal_parameters', [(Carnivore, {'mu': 100})], indirect=True)
+def test_certain_migration(set_animal_parameters, carnivore):
     """
     Testing migration does happen if the conditions are met.
     Making sure the animal's fitness * mu > 1 by setting
@@ -219,8 +188,8 @@ def test_certain_migration(set_carnivore_parameters, carnivore):
     assert carnivore.migrate() is True
 
 
-@pytest.mark.parametrize('set_carnivore_parameters', [{'mu': 0}], indirect=True)
-def test_cartain_no_migration(set_carnivore_parameters, carnivore):
+@pytest.mark.parametrize('set_animal_parameters', [(Carnivore, {'mu': 0})], indirect=True)
+def test_cartain_no_migration(set_animal_parameters, carnivore):
     """
     Testing migration does not happen by setting mu to zero so
     random.random > animal's fitness * mu. The function
@@ -229,26 +198,30 @@ def test_cartain_no_migration(set_carnivore_parameters, carnivore):
     assert carnivore.migrate() is False
 
 
-def test_animal_aging(herbivore, carnivore):
+@pytest.mark.parametrize('species', [Herbivore, Carnivore])
+def test_animal_aging(species):
     """
     Testing that Herbivores and Carnivores age with 1 year.
     """
-    for n in range(10):
-        herbivore.update_age()
-        carnivore.update_age()
-        assert herbivore.age == n + 1 and carnivore.age == n + 1
+    animal = species()
+    ages = []
+    for _ in range(10):
+        animal.update_age()
+        ages.append(animal.age)
+    assert np.array_equal(ages, np.arange(1, 11))
 
 
-def test_animal_metabolism(herbivore, carnivore):
+@pytest.mark.parametrize('species', [Herbivore, Carnivore])
+def test_animal_metabolism(species):
     """
-    Testing each animal loses weight with the metabolism function.
+    Testing each animal loses weight every time the metabolism function is called.
     """
-    h_weight_before = herbivore.weight
-    c_weight_before = carnivore.weight
-
-    herbivore.metabolism()
-    carnivore.metabolism()
-    assert herbivore.weight < h_weight_before and carnivore.weight < c_weight_before
+    animal = species()
+    weights = [animal.weight]
+    for _ in range(10):
+        animal.metabolism()
+        weights.append(animal.weight)
+    assert np.all(np.diff(weights) < 0)
 
 
 def test_death_by_too_low_weight(carnivore):
@@ -257,8 +230,9 @@ def test_death_by_too_low_weight(carnivore):
     assert carnivore.dies()
 
 
-@pytest.mark.parametrize('set_carnivore_parameters', [{'omega': 0.6}], indirect=True)
-def test_dies_z_test(set_carnivore_parameters, carnivore):
+@pytest.mark.parametrize('seed', [SEED + i for i in range(5)])
+@pytest.mark.parametrize('set_animal_parameters', [(Carnivore, {'omega': 0.6})], indirect=True)
+def test_dies_z_test(set_animal_parameters, carnivore, seed):
     """
     Binomial Z-test on the dies()-function with herbivores.
 
@@ -269,30 +243,53 @@ def test_dies_z_test(set_carnivore_parameters, carnivore):
 
     Based on settinkilde.
 
+    The test is repeated for several seeds, so one lucky seed cannot hide an error.
     """
-    random.seed(SEED)
+    rng = np.random.default_rng(seed)
     num = 100
     carnivore.fitness = 0.01
     # Setting fitness so low that probability of death ≈ omega
-    p = carnivore.parameters['omega']
-    n = sum(carnivore.dies() for _ in range(num))  # True == 1, False == 0
+    p = Carnivore.parameters['omega'] * (1 - carnivore.fitness)
+    n = sum(carnivore.dies(rng=rng) for _ in range(num))
 
     mean = num * p
     var = math.sqrt(num * p * (1 - p))
     # noinspection PyPep8Naming
     Z = (n - mean) / var
-    phi = 2 * stats.norm.cdf(-abs(Z))
+    phi = 2 * ndtr(-abs(Z))
     assert phi > ALPHA
 
 
-def test_certain_death(mocker, herbivore):
+@pytest.mark.parametrize('set_animal_parameters', [(Carnivore, {'gamma': 0.5})], indirect=True)
+def test_birth_z_test(set_animal_parameters, rng):
+    """
+    Binomial Z-test on the gives_birth()-function with carnivores.
+
+    H0 = The number of births follows the birth probability gamma * fitness * (N - 1).
+    H1 = The number of births does not follow the birth probability.
+
+    A new mother is made for each trial, since giving birth changes the mother's weight.
+    """
+    num = 100
+    pop_size = 2
+    p = Carnivore(age=5, weight=50).birth_probability(pop_size=pop_size)
+    n = sum(Carnivore(age=5, weight=50).gives_birth(pop_size=pop_size, rng=rng) is not False
+            for _ in range(num))
+
+    mean = num * p
+    var = math.sqrt(num * p * (1 - p))
+    # noinspection PyPep8Naming
+    Z = (n - mean) / var
+    phi = 2 * ndtr(-abs(Z))
+    assert phi > ALPHA
+
+
+def test_certain_death(zero_rng, herbivore):
     """
     Testing death does happen if the conditions are met.
-    Using mocker to set random.random as 0.
+    Using a generator where random() is always 0.
     """
-    mocker.patch('random.random', return_value=0)
-    for _ in range(10):
-        assert herbivore.dies()
+    assert herbivore.dies(rng=zero_rng)
 
 
 def test_return_herbivores_feeding(herbivore):
@@ -307,60 +304,79 @@ def test_return_herbivores_feeding(herbivore):
     assert herbivore.weight == weight_before + (herbivore.parameters['beta'] * landscape_fodder)
 
 
-def test_herb_weightchange_fodder(herbivore):
+def test_herb_feeding_changes_weight_and_fitness(herbivore):
     """
     Testing the herbivore's weight changes as expected after
-    it eats a known amount of fodder.
+    it eats a known amount of fodder, and that its fitness increases.
     """
     weight_before = herbivore.weight
-    herbivore.herbivore_feeding(landscape_fodder=herbivore.appetite)
-    assert herbivore.weight == weight_before + (herbivore.parameters['beta'] * herbivore.appetite)
-
-
-def test_herb_fitnesschange_fodder(herbivore):
-    """
-    Testing the herbivore's fitness changes as expected after it eats.
-    """
     fitness_before = herbivore.fitness
     herbivore.herbivore_feeding(landscape_fodder=herbivore.appetite)
+    assert herbivore.weight == weight_before + (herbivore.parameters['beta'] * herbivore.appetite)
     assert herbivore.fitness > fitness_before
 
 
-def test_carn_nokill(herbivore, carnivore):
+def test_carn_nokill():
     """
     Testing that the carnivore does not kill a herbivore if the herbivore's fitness
     exceeds the carnivore's fitness.
     """
+    herbivore = Herbivore(age=5, weight=20)
+    carnivore = Carnivore(age=5, weight=20)
     # Ensuring herbivore fitness > carnivore fitness
     carnivore.fitness = 0.5
     herbivore.fitness = 1
     assert carnivore.carnivore_feeding(herbivore) is False
 
 
-@pytest.mark.parametrize('set_carnivore_parameters', [{'DeltaPhiMax': 0.5}], indirect=True)
-def test_certain_kill(set_carnivore_parameters, mocker, herbivore, carnivore):
+@pytest.mark.parametrize('set_animal_parameters', [(Carnivore, {'DeltaPhiMax': 0.5})],
+                         indirect=True)
+def test_certain_kill(set_animal_parameters, zero_rng, herbivore, carnivore):
     """
-    Testing the carnivore kills the herbivore using mocker to set
-    random.random as 0 and ensuring DeltaPhi > DeltaPhiMax,
+    Testing the carnivore kills the herbivore using a generator where
+    random() is always 0 and ensuring DeltaPhi > DeltaPhiMax,
     so that the prey probability is 1.
     """
     carnivore.fitness = 1
     herbivore.fitness = 0.1
 
-    mocker.patch('random.random', return_value=0)
-    assert carnivore.carnivore_feeding(herbivore) is True
+    assert carnivore.carnivore_feeding(herbivore, rng=zero_rng) is True
 
 
-def test_nokill_preyprob(mocker, herbivore, carnivore):
+def test_nokill_preyprob():
     """
     Testing carnivore does not kill herbivore if the random probability
     of kill does not exceed the prey probability.
     Setting parameters so the
     prey probability (fitness carnivore - fitness herbivore) / DeltaPhiMax <= 1.
     """
+    herbivore = Herbivore(age=5, weight=20)
+    carnivore = Carnivore(age=5, weight=20)
     herbivore.fitness = 0.3
     carnivore.fitness = 0.8
-    mocker.patch('random.random', return_value=1)
+    assert carnivore.carnivore_feeding(herbivore, rng=FixedRandom(1)) is False
 
-    for _ in range(10):
-        assert carnivore.carnivore_feeding(herbivore) is False
+
+def test_death_probability_no_weight(carnivore):
+    """ Testing the death probability is 1 when the animal's weight is zero. """
+    carnivore.set_weight(new_weight=0)
+    assert carnivore.death_probability() == 1
+
+
+def test_from_array():
+    """
+    Testing animals made from arrays of ages and weights get the same properties
+    as animals made one at a time.
+    """
+    herbs = Herbivore.from_array(np.full(20, 5), np.full(20, 20.0))
+    herb = Herbivore(age=5, weight=20.0)
+
+    assert len(herbs) == 20
+    assert all(h.age == herb.age and h.weight == herb.weight and h.fitness == herb.fitness
+               and h.appetite == herb.appetite for h in herbs)
+
+    with pytest.raises(ValueError):
+        Carnivore.from_array([2, -1], [10, 10])
+
+    with pytest.raises(ValueError):
+        Carnivore.from_array([2, 3], [10, -1])
@@ -190,6 +190,7 @@ def test_add_population(plain_sim):
                                        {'species': 'Carnivore', 'age': 1, 'weight': 10.}]}])
 
 
+@pytest.mark.slow
 def test_vis_img_steps():
     """Test that simulation can be called with visualization step values"""
 
@@ -256,6 +257,7 @@ def figfile_base():
         os.remove(f)
 
 
+@pytest.mark.slow
 def test_figure_saved(figfile_base):
     """Test that figures are saved during simulation"""
 
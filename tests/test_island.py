@@ -2,108 +2,116 @@
 
 from biosim.island import Island
 
+import collections
+import re
 import textwrap
 import pytest
 import numpy as np
 
 
-@pytest.fixture
-def map_island():
-    geography = """\
+GEOGRAPHY = textwrap.dedent("""\
                     WWWWWWWWWWW
                     WLLLHHHLLLW
                     WLLLLLLLLLW
                     WLDDDDLLDDW
                     WLLLLLLLLLW
-                    WWWWWWWWWWW"""
-    geography = textwrap.dedent(geography)
-    return Island(geography)
+                    WWWWWWWWWWW""")
+
+# Initial populations placed on GEOGRAPHY, built once since they are only read.
+INI_POPS = ({'loc': (2, 2),
+             'pop': [{'species': 'Herbivore',
+                      'age': 5,
+                      'weight': 20}] * 20},
+            {'loc': (3, 3),
+             'pop': [{'species': 'Herbivore',
+                      'age': 3,
+                      'weight': 20}] * 15},
+            {'loc': (2, 5),
+             'pop': [{'species': 'Carnivore',
+                      'age': 2,
+                      'weight': 10}] * 4},
+            {'loc': (2, 2),
+             'pop': [{'species': 'Carnivore',
+                      'age': 2,
+                      'weight': 10}] * 6})
+
+# One lowland cell surrounded by water.
+SMALL_GEOGRAPHY = textwrap.dedent("""\
+                    WWW
+                    WLW
+                    WWW""")
+
+# Locations of the four cells next to (3, 4) on GEOGRAPHY, all of them habitable.
+NEIGHBOURS_OF_3_4 = ((2, 4), (4, 4), (3, 5), (3, 3))
+
+# Geographies that Island must reject, with a compiled pattern for the start of the error message.
+BAD_MAPS = [(textwrap.dedent("""\
+                WWWW
+                WLW
+                WWW"""),
+             re.compile(re.escape('The map has to be a rectangular shape! \n'
+                                  'All rows do not contain the same amount of letters'))),
+            (textwrap.dedent("""\
+                DWW
+                WLW
+                WWW"""),
+             re.compile(re.escape('Cells at the border have to be water!'))),
+            (textwrap.dedent("""\
+                WWW
+                W W
+                WWW"""),
+             re.compile(re.escape('There is a hole in the map'))),
+            (textwrap.dedent("""\
+                WWW
+                WdW
+                WWW"""),
+             re.compile(re.escape('The d is an Invalid habitat type')))]
 
 
 @pytest.fixture
-def ini_pops():
-    ini_pops = [{'loc': (2, 2),
-                 'pop': [{'species': 'Herbivore',
-                          'age': 5,
-                          'weight': 20}
-                         for _ in range(20)]},
-                {'loc': (3, 3),
-                 'pop': [{'species': 'Herbivore',
-                          'age': 3,
-                          'weight': 20}
-                         for _ in range(15)]},
-                {'loc': (2, 5),
-                 'pop': [{'species': 'Carnivore',
-                          'age': 2,
-                          'weight': 10}
-                         for _ in range(4)]},
-                {'loc': (2, 2),
-                 'pop': [{'species': 'Carnivore',
-                          'age': 2,
-                          'weight': 10}
-                         for _ in range(6)]}]
-    return ini_pops
-
-
-def test_creatmap(map_island):
+def map_island():
     """
-    Tests if an Island is initialized and has the attribute self.map
-    with an empty geogr the len is zero.
+    Fixture with a new island for each test, since most tests place animals on it.
+    Building the island is cheaper than deep-copying a shared one.
     """
-    assert len(map_island.map) > 0
+    return Island(GEOGRAPHY)
 
 
-def test_non_rectangular_shape():
+@pytest.fixture(scope='module')
+def shared_island():
     """
-    Tests what happens if the island geography is non-rectangular.
+    Fixture with one island shared by all tests in the module.
+    Only use it in tests that do not change the island.
     """
-    geogr = """\
-                WWWW
-                WLW
-                WWW"""
-    geogr = textwrap.dedent(geogr)
-    with pytest.raises(ValueError, match='The map has to be a rectangular shape! \n'
-                       'All rows do not contain the same amount of letters'):
-        Island(geogr)
+    return Island(GEOGRAPHY)
 
 
-def test_no_water_at_boarder():
+@pytest.fixture(scope='module')
+def ini_pops():
     """
-    Tests if the ValueError is raised if a non-water landscape at the border of the map
+    Fixture with the initial populations, shared by all tests in the module.
+    place_population() only reads the populations.
     """
-    geogr = """\
-                DWW
-                WLW
-                WWW"""
-    geogr = textwrap.dedent(geogr)
-    with pytest.raises(ValueError, match='Cells at the border have to be water!'):
-        Island(geogr)
+    return INI_POPS
 
 
-def test_hole_in_the_map():
+def test_creatmap(shared_island):
     """
-    Test if the ValueError is raised if there is a hole in the map
+    Tests if an Island is initialized and has the attribute self.map
+    with an empty geogr the len is zero.
     """
-    geogr = """\
-                WWW
-                W W
-                WWW"""
-    geogr = textwrap.dedent(geogr)
-    with pytest.raises(ValueError):
-        Island(geogr)
+    assert len(shared_island.map) > 0
 
 
-def test_invalid_habitat_on_map():
+@pytest.mark.parametrize('geogr, match', BAD_MAPS,
+                         ids=['non_rectangular', 'no_water_at_border', 'hole', 'invalid_habitat'])
+def test_invalid_geography(geogr, match):
     """
-    Test if the ValueError is raised if there is an invalid habitat-letter in the map.
+    Tests that a ValueError is raised for a geography that is not rectangular,
+    has land at the border, has a hole in the map or has an invalid habitat-letter.
     The only valid habitat letters are W, D, H, L.
     """
-    geogr = """\
-                WWW
-                WdW
-                WWW"""
-    geogr = textwrap.dedent(geogr)
-    with pytest.raises(ValueError):
+    with pytest.raises(ValueError, match=match):
         Island(geogr)
 
 
@@ -115,45 +123,52 @@ def test_placing_population(ini_pops):
     populations = [{'loc': (2, 2),
                     'pop': [{'species': 'Herbivore',
                             'age': 5,
-                             'weight': 20}
-                            for _ in range(200)]},
+                             'weight': 20}] * 200},
                    {'loc': (3, 4),
                     'pop': [{'species': 'Carnivore',
                             'age': 3,
-                             'weight': 20}
-                            for _ in range(30)]}]
-    geogr = """\
-                    WWW
-                    WLW
-                    WWW"""
-    geogr = textwrap.dedent(geogr)
-    i = Island(geogr)
+                             'weight': 20}] * 30}]
+    i = Island(SMALL_GEOGRAPHY)
+    cell = i.map[(2, 2)]
 
     with pytest.raises(ValueError):
         i.place_population(populations=populations)
 
-    assert len(i.map[(2, 2)].herb_pop) == 200
+    assert len(cell.herb_pop) == 200
 
 
 def test_place_population_in_water():
     """
     Test that placing a population in water gives a ValueError.
     """
-    geogr = """\
-                WWW
-                WLW
-                WWW"""
-    geogr = textwrap.dedent(geogr)
-    i = Island(geogr)
+    i = Island(SMALL_GEOGRAPHY)
     populations = [{'loc': (1, 2),
                     'pop': [{'species': 'Herbivore',
                              'age': 5,
-                             'weight': 20}
-                            for _ in range(200)]}]
+                             'weight': 20}] * 200}]
     with pytest.raises(ValueError):
         i.place_population(populations)
 
 
+def test_place_population_from_arrays(map_island):
+    """
+    Testing a population given with arrays of ages and weights is placed
+    the same way as a population given animal by animal.
+    """
+    populations = [{'loc': (2, 2),
+                    'pop': [{'species': 'Herbivore',
+                             'ages': np.full(200, 5, dtype=np.int32),
+                             'weights': np.full(200, 20.0)},
+                            {'species': 'Carnivore',
+                             'age': 3,
+                             'weight': 20}]}]
+    map_island.place_population(populations)
+    cell = map_island.map[(2, 2)]
+
+    assert len(cell.herb_pop) == 200 and len(cell.carn_pop) == 1
+    assert all(herb.age == 5 and herb.weight == 20.0 for herb in cell.herb_pop)
+
+
 def test_set_animal_parameters(ini_pops, map_island):
     """
     Testing it is possible to set parameters for animals.
@@ -185,59 +200,86 @@ def test_get_num_herbs(map_island, ini_pops):
     on the island returns the correct total.
     """
     map_island.place_population(ini_pops)
-    total_herb = 0
-    total_carn = 0
-    for population in ini_pops:
-        pop = population['pop']
-        for animal in pop:
-            if animal['species'] == 'Herbivore':
-                total_herb += 1
-            elif animal['species'] == 'Carnivore':
-                total_carn += 1
+    species = collections.Counter(animal['species']
+                                  for population in ini_pops for animal in population['pop'])
+    total_herb = species['Herbivore']
+    total_carn = species['Carnivore']
     assert map_island.get_number_of_herbs() == total_herb
     assert map_island.get_number_of_carns() == total_carn
 
 
-def test_gives_animal_fitness(map_island, ini_pops):
+def test_animal_count_updated(map_island, ini_pops):
     """
-    Testing if get_'species'_fitness indeed returns a list of all the species' fitness.
+    Testing that the cached animal counts are updated when a population is placed,
+    and when the annual cycle has run.
     """
-    before_herb = len(map_island.get_herbs_fitness())
-    before_carn = len(map_island.get_carns_fitness())
+    assert map_island.get_number_of_herbs() == 0
     map_island.place_population(ini_pops)
-    after_herb = len(map_island.get_herbs_fitness())
-    after_carn = len(map_island.get_carns_fitness())
+    assert map_island.get_number_of_herbs() == 35
+    assert map_island.get_number_herbs_per_cell().sum() == 35
 
-    assert before_herb < after_herb
-    assert before_carn < after_carn
+    map_island.annual_cycle_island()
+    herb_count = sum(cell.get_num_herbs() for cell in map_island.map.values())
+    assert map_island.get_number_of_herbs() == herb_count
 
 
-def test_get_species_age(map_island, ini_pops):
+def test_animal_counts_read_only(map_island, ini_pops):
     """
-    Testing if the get "species" age function indeed returns a list of ages of the species.
+    Testing that the cached counts per cell cannot be changed by a caller,
+    and that invalidate_counts() makes the island count changes made directly in the map.
     """
-    before_herb = len(map_island.get_herbs_age())
-    before_carn = len(map_island.get_carns_age())
     map_island.place_population(ini_pops)
-    after_herb = len(map_island.get_herbs_age())
-    after_carn = len(map_island.get_carns_age())
+    herbs_per_cell = map_island.get_number_herbs_per_cell()
+    with pytest.raises(ValueError):
+        herbs_per_cell[1, 1] = 99
+
+    for cell in map_island.map.values():
+        cell.herb_pop.clear()
+    map_island.invalidate_counts()
+    assert map_island.get_number_of_herbs() == 0
+    assert map_island.get_number_herbs_per_cell().sum() == 0
+
+
+@pytest.mark.parametrize('getter, counter',
+                         [('get_herbs_fitness', 'get_number_of_herbs'),
+                          ('get_carns_fitness', 'get_number_of_carns'),
+                          ('get_herbs_age', 'get_number_of_herbs'),
+                          ('get_carns_age', 'get_number_of_carns'),
+                          ('get_herbs_weight', 'get_number_of_herbs'),
+                          ('get_carns_weight', 'get_number_of_carns')])
+def test_get_animal_values(map_island, ini_pops, getter, counter):
+    """
+    Testing if the get-functions for fitness, age and weight of each species
+    return one value for every animal of the species placed on the island.
+    """
+    assert getattr(map_island, getter)().size == 0
+    map_island.place_population(ini_pops)
+
+    assert getattr(map_island, getter)().size == getattr(map_island, counter)() > 0
 
-    assert before_herb < after_herb
-    assert before_carn < after_carn
+
+def test_get_animal_ages_are_integers(map_island, ini_pops):
+    """
+    Testing that the arrays of ages hold integers, like the ages of the animals.
+    """
+    map_island.place_population(ini_pops)
+    for ages in (map_island.get_herbs_age(), map_island.get_carns_age()):
+        assert ages.dtype.kind == 'i'
+    herb_ages = map_island.get_animal_properties()['age']['Herbivore']
+    assert map_island.get_herbs_age().tolist() == herb_ages
 
 
-def test_get_species_weight(map_island, ini_pops):
+def test_get_animal_properties(map_island, ini_pops):
     """
-    Testing if get "species" weight function indeed returns a list of the animals weight.
+    Testing that the properties collected in one pass are the same as from the
+    separate get-functions.
     """
-    before_herb = len(map_island.get_herbs_weight())
-    before_carn = len(map_island.get_carns_weight())
     map_island.place_population(ini_pops)
-    after_herb = len(map_island.get_herbs_weight())
-    after_carn = len(map_island.get_carns_weight())
+    properties = map_island.get_animal_properties()
 
-    assert before_herb < after_herb
-    assert before_carn < after_carn
+    assert np.array_equal(properties['fitness']['Herbivore'], map_island.get_herbs_fitness())
+    assert np.array_equal(properties['age']['Carnivore'], map_island.get_carns_age())
+    assert np.array_equal(properties['weight']['Herbivore'], map_island.get_herbs_weight())
 
 
 def test_island_migration_happens(map_island):
@@ -253,42 +295,68 @@ def test_island_migration_happens(map_island):
     # to ensure some herbivores migrate.
     ini_pop = [{'loc': (3, 4),
                 'pop': [{'species': 'Herbivore',
-                         'age': 5,
-                         'weight': 20}
-                        for _ in range(250)]}]
+                         'ages': np.full(250, 5),
+                         'weights': np.full(250, 20.0)}]}]
 
     map_island.place_population(ini_pop)
     before = map_island.get_number_herbs_per_cell()
     map_island.island_migration()
     after = map_island.get_number_herbs_per_cell()
 
-    assert np.array_equal(before, after) is False
+    assert np.any(before != after)
 
 
 def test_island_migration_happens_once(map_island):
     """
     Testing an animal only migrates once per year.
     Forcing migration with low age and large weight,
-    so that the animal has to be in a neighbouring cell.
-    Checking animal count in neighbouring cells and confirming the cell's
-    combined herb_pop = 1.
-    Resetting map-populations before running it again.
+    so that every animal has to be in a neighbouring cell.
+    Placing ten animals in one cell, and confirming the neighbouring cells'
+    combined herb_pop = 10 after one migration.
+    An animal migrating twice could end up back in the starting cell,
+    or two cells away.
     """
+    num_herbs = 10
     ini_pop = [{'loc': (3, 4),
                 'pop': [{'species': 'Herbivore',
                          'age': 0,
-                         'weight': 100}]}]
+                         'weight': 100}] * num_herbs}]
     map_island.set_animal_parameters_island('Herbivore', {'mu': 1.5})
-    loc = (3, 4)
-    neighbors = [map_island.map[(loc[0] - 1, loc[1])],
-                 map_island.map[(loc[0] + 1, loc[1])],
-                 map_island.map[(loc[0], loc[1] + 1)],
-                 map_island.map[(loc[0], loc[1] - 1)]]
-    for test in range(10):
-        map_island._clean_island_for_herbs()
-        map_island.place_population(ini_pop)
-        map_island.island_migration()
-        herb_count = 0
-        for cell in neighbors:
-            herb_count += len(cell.herb_pop)
-        assert herb_count == 1
+    neighbors = [map_island.map[loc] for loc in NEIGHBOURS_OF_3_4]
+    map_island.place_population(ini_pop)
+    map_island.island_migration()
+    assert sum(len(cell.herb_pop) for cell in neighbors) == num_herbs
+
+
+def test_seed_cells(map_island):
+    """
+    Testing that seeding gives the habitable cells reproducible generators,
+    and leaves the water cells without generators.
+    """
+    map_island.seed_cells(1)
+    draws = {loc: (cell.rng.random(), cell.np_rng.random())
+             for loc, cell in map_island.map.items() if cell.habitability is True}
+    map_island.seed_cells(1)
+    for loc, cell in map_island.map.items():
+        if cell.habitability is True:
+            assert (cell.rng.random(), cell.np_rng.random()) == draws[loc]
+        else:
+            assert cell.rng is None and cell.np_rng is None
+    assert len(set(draws.values())) == len(draws)
+
+
+def test_annual_cycle_with_pool(map_island, ini_pops):
+    """
+    Testing the annual cycle can run the pre migration cycle in worker processes,
+    and that the updates from the workers reach the cells on the map,
+    which are kept so the neighbours of the active cells stay valid.
+    """
+    map_island.place_population(ini_pops)
+    cell_before = map_island.map[(2, 2)]
+    with map_island.make_pool(processes=2) as pool:
+        map_island.annual_cycle_island(pool=pool, processes=2)
+
+    assert map_island.map[(2, 2)] is cell_before
+    assert cell_before.fodder < cell_before.parameters['f_max']
+    assert all(map_island.map[loc] is cell for loc, cell, neighbours in map_island._active_cells)
+    assert map_island.get_number_of_herbs() > 0
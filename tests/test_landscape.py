@@ -1,86 +1,72 @@
 """Tests for the Landscape superclass with associated subclasses."""
 
 from biosim.landscape import Lowland, Highland, Water, Desert
-from biosim.animals import *
+from biosim.animals import Herbivore, Carnivore
+from conftest import SEED
 
+import numpy as np
 import pytest
-import random
 
 
-@pytest.fixture
-def set_lowland_parameters(request):
+def generate_pop(species, age, weight, num):
     """
-    Fixture setting class parameters for Lowland, based on H.E. Plesser's biolab/bacteria.py.
-
-    The fixture sets the Lowland parameters when called for setup,
-    and resets them when called for teardown. This ensures that modified
-    parameters are always reset before leaving a test.
-
-    This fixture should be called via parametrize with indirect=True.
-
-    :param request: Request object automatically provided by pytest.
-                    request.param is the parameter dictionary to be passed to
-                    Lowland.set_parameters()
+    A function that generates a population of one species.
+    Write None for age and weight if you do not want to specify.
+    When both are given, the animals are made in one batch with from_array().
     """
-    default_parameters = Lowland.parameters.copy()
-    Lowland.set_parameters(request.param)
-    yield
-    Lowland.set_parameters(default_parameters)
+    if age is not None and weight is not None:
+        return species.from_array(np.full(num, age), np.full(num, weight, dtype=float))
+    return [species(age=age, weight=weight) for _ in range(num)]
 
 
-@pytest.fixture
-def set_highland_parameters(request):
+def mean_value(population, attribute):
     """
-    Fixture setting class parameters for Highland, based on H.E. Plesser's biolab/bacteria.py.
-
-    The fixture sets the Highland parameters when called for setup,
-    and resets them when called for teardown. This ensures that modified
-    parameters are always reset before leaving a test.
-
-    This fixture should be called via parametrize with indirect=True.
-
-    :param request: Request object automatically provided by pytest.
-                    request.param is the parameter dictionary to be passed to
-                    Highland.set_parameters()
+    Mean of an attribute, e.g. 'weight', over all animals in a population.
     """
-    default_parameters = Highland.parameters.copy()
-    Highland.set_parameters(request.param)
-    yield
-    Highland.set_parameters(default_parameters)
+    return np.fromiter((getattr(animal, attribute) for animal in population),
+                       dtype=float, count=len(population)).mean()
 
 
-def generate_herb_pop(age, weight, num_herbs):
+@pytest.fixture(scope='module')
+def herb_pop():
     """
-    A function that generates a herbivore population.
-    Write None for age and weight if you do not want to specify.
+    Fixture with a herbivore population description, shared by all tests in the module.
+    It is a tuple, since the tests only read it.
     """
-    return [Herbivore(age=age, weight=weight) for _ in range(num_herbs)]
+    herb_pop = ({'species': 'Herbivore',
+                 'age': 5,
+                 'weight': 20},) * 150
+    return herb_pop
 
 
-def generate_carn_pop(age, weight, num_carns):
+@pytest.fixture(scope='module')
+def canonical_pops():
     """
-    A function that generates a herbivore population.
-    Write None for age and weight if you do not want to specify.
+    Fixture with a herbivore and a carnivore population, shared by all tests in the module.
+    They are tuples, since the tests only count the animals.
     """
-    return [Carnivore(age=age, weight=weight) for _ in range(num_carns)]
+    return (tuple(Herbivore(age=5) for _ in range(50)),
+            tuple(Carnivore(age=2) for _ in range(10)))
 
 
-@pytest.fixture
-def herb_pop():
-    herb_pop = [{'species': 'Herbivore',
-                 'age': 5,
-                 'weight': 20}
-                for _ in range(150)]
-    return herb_pop
+@pytest.fixture(scope='module')
+def small_herb_pop():
+    """
+    Fixture with a small herbivore population, shared by all tests in the module.
+    It is a tuple, so tests sorting the population must make their own list of it.
+    """
+    return tuple(Herbivore() for _ in range(10))
 
 
 @pytest.fixture
 def highland():
+    """ Fixture with a new Highland for each test, since tests change its population and fodder."""
     return Highland()
 
 
 @pytest.fixture
 def lowland():
+    """ Fixture with a new Lowland for each test, since tests change its population and fodder."""
     return Lowland()
 
 
@@ -93,31 +79,26 @@ def test_input_param_landscape():
     assert Highland.parameters['f_max'] == 300
 
 
-def test_param_mistake_landscape():
+@pytest.mark.parametrize('landscape_cls', [Lowland, Highland, Desert, Water])
+def test_param_mistake_landscape(landscape_cls):
     """
     Testing that errors are raised when input parameters are erroneous.
     """
     with pytest.raises(KeyError):
-        Lowland.set_parameters({'fmax': 20})
+        landscape_cls.set_parameters({'fmax': 20})
 
     with pytest.raises(ValueError):
-        Lowland.set_parameters({'f_max': -40})
+        landscape_cls.set_parameters({'f_max': -40})
 
 
-def test_landscape_construction():
+@pytest.mark.parametrize('landscape_cls', [Lowland, Highland, Desert])
+def test_landscape_construction(landscape_cls, canonical_pops):
     """
     Testing that creating landscapes with a given list of animal objects works.
     """
-    number_herb = 50
-    number_carn = 10
-    herb_pop = [Herbivore(age=5) for _ in range(number_herb)]
-    carn_pop = [Carnivore(age=2) for _ in range(number_carn)]
-    low = Lowland(herb_pop, carn_pop)
-    h = Highland(herb_pop, carn_pop)
-    d = Desert(herb_pop, carn_pop)
-
-    for landscape in (low, h, d):
-        assert landscape.get_num_herbs() == number_herb and landscape.get_num_carns() == number_carn
+    herb_pop, carn_pop = canonical_pops
+    landscape = landscape_cls(herb_pop, carn_pop)
+    assert landscape.get_num_herbs() == len(herb_pop) and landscape.get_num_carns() == len(carn_pop)
 
 
 def test_habitability_true(herb_pop):
@@ -144,8 +125,7 @@ def test_add_population_species(highland):
     raise a KeyError as expected.
     """
     herb_pop = [{'age': 5,
-                'weight': 20}
-                for _ in range(150)]
+                'weight': 20}] * 150
 
     with pytest.raises(KeyError):
         highland.add_population(herb_pop)
@@ -158,43 +138,77 @@ def test_add_population_expected(lowland):
     num = 30
     carn_pop = [{'species': 'Carnivore',
                  'age': 5,
-                 'weight': 20}
-                for _ in range(num)]
+                 'weight': 20}] * num
     lowland.add_population(animals=carn_pop)
     assert len(lowland.carn_pop) == num
 
 
-def test_sort_herbs_by_fitness():
+def test_add_population_without_age_and_weight(lowland):
+    """
+    Testing that animals described with None for age or weight are added,
+    with age 0 and a drawn birth weight, in the order they are given.
+    """
+    lowland.add_population([{'species': 'Herbivore', 'age': 3, 'weight': 20},
+                            {'species': 'Herbivore', 'age': None, 'weight': None},
+                            {'species': 'Herbivore', 'age': 4, 'weight': None},
+                            {'species': 'Herbivore', 'age': 5, 'weight': 30}])
+    assert [herb.age for herb in lowland.herb_pop] == [3, 0, 4, 5]
+    assert lowland.herb_pop[0].weight == 20 and lowland.herb_pop[3].weight == 30
+    assert all(herb.weight > 0 for herb in lowland.herb_pop[1:3])
+
+
+@pytest.mark.parametrize('landscape_cls', [Lowland, Highland, Desert])
+def test_sort_herbs_by_fitness(landscape_cls, small_herb_pop):
     """
     Testing if the list of herbivores are sorted by decreasing fitness when decreasing=True.
+    Sorting only reorders the list, so the animals can be shared between tests.
     """
-    herb_pop = [Herbivore() for _ in range(10)]
-    h = Highland(herb_pop)
+    h = landscape_cls(list(small_herb_pop))
     h.sort_herbs_by_fitness(decreasing=True)
-    failed = 0
-    if all(h.herb_pop[i].fitness <= h.herb_pop[i + 1].fitness for i in range(len(h.herb_pop) - 1)):
-        failed += 1
-    assert failed == 0
+    fitness = np.fromiter((herb.fitness for herb in h.herb_pop), dtype=float, count=len(h.herb_pop))
+    assert np.all(np.diff(fitness) <= 0)
+
+
+def test_sort_herbs_by_increasing_fitness(small_herb_pop):
+    """
+    Testing if the list of herbivores are sorted by increasing fitness when decreasing=False.
+    """
+    h = Lowland(list(small_herb_pop))
+    h.sort_herbs_by_fitness(decreasing=False)
+    fitness = np.fromiter((herb.fitness for herb in h.herb_pop), dtype=float, count=len(h.herb_pop))
+    assert np.all(np.diff(fitness) >= 0)
 
 
-def test_regrowth(lowland):
+@pytest.mark.parametrize('landscape_cls', [Lowland, Highland, Desert])
+def test_regrowth(landscape_cls):
     """
     Testing regrowth of fodder sets the fodder amount to f_max.
     """
-    lowland.fodder = 20
-    lowland.regrowth()
-    assert lowland.fodder == lowland.parameters['f_max']
+    landscape = landscape_cls()
+    landscape.fodder = 20
+    landscape.regrowth()
+    assert landscape.fodder == landscape.parameters['f_max']
+
+
+@pytest.mark.parametrize('set_landscape_parameters, f_max',
+                         [((Lowland, {'f_max': f_max}), f_max) for f_max in (0, 200, 400, 800)],
+                         indirect=['set_landscape_parameters'])
+def test_setting_fodder_amount(set_landscape_parameters, f_max):
+    """
+    Testing that a new Lowland gets the fodder amount set with set_parameters().
+    """
+    assert Lowland().fodder == f_max
 
 
 def test_herbivores_eating():
     """
     Testing if herbivores are eating by comparing their mean weight before and after eating.
     """
-    herb_pop = generate_herb_pop(None, None, 20)
+    herb_pop = generate_pop(Herbivore, None, None, 20)
     h = Highland(herb_pop)
-    original_mean_weight = sum([herb.weight for herb in h.herb_pop]) / len(h.herb_pop)
+    original_mean_weight = mean_value(h.herb_pop, 'weight')
     h.herbivores_eating()
-    post_eating_mean_weight = sum([herb.weight for herb in h.herb_pop]) / len(h.herb_pop)
+    post_eating_mean_weight = mean_value(h.herb_pop, 'weight')
     assert original_mean_weight < post_eating_mean_weight
 
 
@@ -205,11 +219,13 @@ def test_carnivores_eating():
     herb_pop = [Herbivore() for _ in range(100)]
     carn_pop = [Carnivore() for _ in range(5)]
     d = Desert(herb_pop, carn_pop)
-
+    herb_counts = [d.get_num_herbs()]
     for hunting_season in range(5):
-        herb_pop_before_hunting = d.get_num_herbs()
+        if herb_counts[-1] == 0:
+            break
         d.carnivores_eating()
-        assert d.get_num_herbs() <= herb_pop_before_hunting
+        herb_counts.append(d.get_num_herbs())
+    assert np.all(np.diff(herb_counts) <= 0)
 
 
 def test_reproduction():
@@ -217,13 +233,13 @@ def test_reproduction():
     Testing both populations increase after the breeding season. Setting weight high
     and age low to ensure good fitness and that feeding happens.
     """
-    herb_pop = [Herbivore(age=1, weight=50) for _ in range(100)]
-    carn_pop = [Carnivore(age=1, weight=50) for _ in range(5)]
+    herb_pop = generate_pop(Herbivore, 1, 50, 100)
+    carn_pop = generate_pop(Carnivore, 1, 50, 5)
     h = Highland(herb_pop, carn_pop)
     herb_count_old = h.get_num_herbs()
     carn_count_old = h.get_num_carns()
 
-    for _ in range(10):
+    for _ in range(3):
         h.reproduction()
         herb_count = h.get_num_herbs()
         carn_count = h.get_num_carns()
@@ -235,8 +251,8 @@ def test_register_migrants():
     """
     Testing that the input animal is appended to the right list of migrating animals.
     """
-    herb_pop = [Herbivore(age=1, weight=50) for _ in range(20)]
-    carn_pop = [Carnivore(age=2, weight=50) for _ in range(20)]
+    herb_pop = generate_pop(Herbivore, 1, 50, 20)
+    carn_pop = generate_pop(Carnivore, 2, 50, 20)
     low = Lowland(herb_pop=herb_pop, carn_pop=carn_pop)
     for herb in herb_pop:
         low.register_migrants(herb)
@@ -250,10 +266,10 @@ def test_add_migrators():
     Testing that the migrators are added to the population,
     and that the list of migrators is emptied.
     """
-    carn_pop = [Carnivore(age=1, weight=50) for _ in range(20)]
+    carn_pop = generate_pop(Carnivore, 1, 50, 20)
     h = Highland(carn_pop=carn_pop)
     len_carn_before = len(h.carn_pop)
-    h.migrating_carns = [Carnivore(age=1, weight=50) for _ in range(3)]
+    h.migrating_carns = generate_pop(Carnivore, 1, 50, 3)
     h.add_migraters_to_pop()
     len_carn_after = len(h.carn_pop)
     assert len(h.migrating_carns) == 0 and len_carn_after > len_carn_before
@@ -262,35 +278,31 @@ def test_add_migrators():
 def test_aging():
     """
     Testing whether a population ages.
-    Using a function for calculating mean age to compare the mean age
+    Using mean_value() for calculating mean age to compare the mean age
     after aging is bigger than before, or is equal to 1 in the carnivore population's case
     """
-    def get_mean_age(population):
-        return sum([animal.age for animal in population]) / len(population)
-
-    herb_pop = [Herbivore(age=age) for herb, age in zip(range(250),
-                                                        [random.randint(0, 6) for _ in range(250)])]
+    rng = np.random.default_rng(SEED)
+    herb_pop = Herbivore.from_array(rng.integers(0, 7, size=250), np.full(250, 20.0))
     carn_pop = [Carnivore(age=0) for _ in range(5)]
     low = Lowland(herb_pop, carn_pop)
-    herb_age_before = get_mean_age(low.herb_pop)
+    herb_age_before = mean_value(low.herb_pop, 'age')
     low.aging()
-    assert get_mean_age(low.herb_pop) > herb_age_before and get_mean_age(low.carn_pop) == 1
+    assert mean_value(low.herb_pop, 'age') > herb_age_before
+    assert mean_value(low.carn_pop, 'age') == 1
 
 
 def test_population_weightloss():
     """
     Testing the mean weight of a population is lower after the animal's annual weightloss.
     """
-    def get_mean_weight(population):
-        return sum([animal.weight for animal in population]) / len(population)
-    herb_pop = generate_herb_pop(None, None, 10)
-    carn_pop = generate_carn_pop(None, None, 10)
+    herb_pop = generate_pop(Herbivore, None, None, 10)
+    carn_pop = generate_pop(Carnivore, None, None, 10)
     h = Highland(herb_pop, carn_pop)
-    herb_weight_before = get_mean_weight(h.herb_pop)
-    carn_weight_before = get_mean_weight(h.carn_pop)
+    herb_weight_before = mean_value(h.herb_pop, 'weight')
+    carn_weight_before = mean_value(h.carn_pop, 'weight')
     h.weight_loss()
-    assert get_mean_weight(h.herb_pop) < herb_weight_before \
-           and get_mean_weight(h.carn_pop) < carn_weight_before
+    assert mean_value(h.herb_pop, 'weight') < herb_weight_before \
+           and mean_value(h.carn_pop, 'weight') < carn_weight_before
 
 
 def test_population_death_occurs():
@@ -299,8 +311,8 @@ def test_population_death_occurs():
     Ensuring some animals are expected to die by setting
     the age high and weight low (bad fitness), and setting the population to 100.
     """
-    carn_pop = generate_carn_pop(age=60, weight=2, num_carns=100)
-    herb_pop = generate_herb_pop(age=60, weight=2, num_herbs=100)
+    carn_pop = generate_pop(Carnivore, age=60, weight=2, num=100)
+    herb_pop = generate_pop(Herbivore, age=60, weight=2, num=100)
     d = Desert(herb_pop=herb_pop, carn_pop=carn_pop)
     carn_pop_before = len(d.carn_pop)
     herb_pop_before = len(d.herb_pop)
@@ -314,8 +326,8 @@ def test_animal_migration(lowland):
     in the population doesn't change after running migration,
     and that it returns a list with animals if there is a change of population.
     """
-    lowland.herb_pop = generate_herb_pop(age=5, weight=None, num_herbs=20)
-    lowland.carn_pop = generate_carn_pop(age=5, weight=None, num_carns=10)
+    lowland.herb_pop = generate_pop(Herbivore, age=5, weight=None, num=20)
+    lowland.carn_pop = generate_pop(Carnivore, age=5, weight=None, num=10)
     num_herbs_old = lowland.get_num_herbs()
     num_carns_old = lowland.get_num_carns()
     migrators_herb, migrators_carn = lowland.animal_migration()
@@ -327,3 +339,11 @@ def test_animal_migration(lowland):
         assert len(migrators_carn) > 0
     else:
         assert len(migrators_carn) == 0
+
+
+def test_draw_events(lowland):
+    """
+    Testing that events with probability 1 always happen, and events with probability 0 never do.
+    """
+    events = lowland.draw_events([1, 0, 1, 0])
+    assert list(events) == [True, False, True, False]
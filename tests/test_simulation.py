@@ -0,0 +1,69 @@
+"""Tests for the BioSim class"""
+
+from biosim import simulation
+from biosim.simulation import BioSim
+
+import random
+import pytest
+
+
+@pytest.fixture
+def ini_pop():
+    return [{'loc': (2, 2),
+             'pop': [{'species': 'Herbivore',
+                      'age': 5,
+                      'weight': 20}] * 50}]
+
+
+def test_simulation_cached(monkeypatch, tmp_path, ini_pop):
+    """
+    Testing that a simulation without graphics is cached to disk when BIOSIM_CACHE is 1,
+    and that an identical simulation gets the same result from the cache.
+    The second simulation fails if it runs the annual cycle instead of loading the cache.
+    Both simulations warn that they run without graphics, and only the cache file is left.
+    """
+    monkeypatch.setenv('BIOSIM_CACHE', '1')
+    monkeypatch.setattr(simulation, '_CACHE_DIR', str(tmp_path))
+
+    def no_annual_cycle(self, *args, **kwargs):
+        raise AssertionError('The simulation was run instead of loaded from the cache')
+
+    results = []
+    for run in range(2):
+        if run == 1:
+            monkeypatch.setattr(simulation.Island, 'annual_cycle_island', no_annual_cycle)
+        sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=ini_pop, seed=1, vis_years=0)
+        with pytest.warns(UserWarning, match='without graphics'):
+            sim.simulate(num_years=5)
+        results.append((sim.year, sim.num_animals_per_species, random.random()))
+
+    assert [path.suffix for path in tmp_path.iterdir()] == ['.pkl']
+    assert results[0] == results[1]
+
+
+def test_parallel_simulation_reproducible(ini_pop):
+    """
+    Testing that a seeded simulation gives the same island with and without worker processes,
+    since every cell has its own random number generator.
+    """
+    results = []
+    for processes in (1, 2):
+        sim = BioSim(island_map="WWWWW\nWLHLW\nWLLLW\nWWWWW", ini_pop=ini_pop, seed=42,
+                     vis_years=0, processes=processes)
+        sim.simulate(num_years=5)
+        results.append(sim.island.get_number_herbs_per_cell())
+
+    assert (results[0] == results[1]).all()
+
+
+@pytest.mark.parametrize('num_years, message', [(2.5, 'must be an int, got float'),
+                                                (True, 'must be an int, got bool'),
+                                                (-3, 'must be non-negative, got -3')])
+def test_simulate_invalid_num_years(num_years, message):
+    """
+    Testing that simulate() rejects a number of years that is not a non-negative int,
+    and reports the offending value.
+    """
+    sim = BioSim(island_map="WWW\nWLW\nWWW", ini_pop=[], seed=1, vis_years=0)
+    with pytest.raises(ValueError, match=message):
+        sim.simulate(num_years=num_years)